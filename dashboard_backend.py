@@ -5,16 +5,27 @@ Provides statistics, backtesting results, and leaderboards for copy traders
 
 import os
 import json
+import atexit
 import sqlite3
+import queue
 import logging
+import threading
 import requests
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from flask import Flask, jsonify, request, send_from_directory
+from functools import lru_cache, wraps
+from typing import Dict, Iterable, Iterator, List, Optional
+import orjson
+from requests.adapters import HTTPAdapter
+from flask import Flask, request, send_from_directory
 from flask_cors import CORS
 from dataclasses import dataclass, asdict
 import hashlib
 
+from sqlite_connections import ConnectionPool
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -24,6 +35,18 @@ CORS(dashboard_app)
 # Bot API Configuration (for fetching signal data)
 BOT_API_URL = os.getenv('BOT_API_URL', 'https://web-production-1299f.up.railway.app')
 
+# Shared keep-alive session for bot API calls, so each proxied request
+# reuses a pooled connection instead of paying a new TCP/TLS handshake.
+# Failed calls are not retried: the local signal history is the fallback,
+# so it is served after one BOT_API_TIMEOUT rather than several.
+_bot_session = requests.Session()
+_bot_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=0)
+_bot_session.mount('https://', _bot_adapter)
+_bot_session.mount('http://', _bot_adapter)
+
+# Seconds to wait for the bot API to connect and to respond
+BOT_API_TIMEOUT = (3.05, 10)
+
 # Discord OAuth Configuration
 DISCORD_CLIENT_ID = os.getenv('DISCORD_CLIENT_ID', '')
 DISCORD_CLIENT_SECRET = os.getenv('DISCORD_CLIENT_SECRET', '')
@@ -35,6 +58,219 @@ DISCORD_API_URL = 'https://discord.com/api/v10'
 # Database path (for user management, strategies, etc. - NOT for signal data)
 DASHBOARD_DB = "trading_dashboard.db"
 
+# Bot's signal database, read by the signal history fallback and backtests
+SIGNALS_DB = "telegram_messages.db"
+
+# Leaderboard sort expressions, keyed by the ?metric= query parameter
+LEADERBOARD_ORDER_BY = {
+    'profit': 'total_profit',
+    'win_rate': 'win_rate',
+    'profit_factor': 'profit_factor',
+    'trades': 'total_trades',
+    'roi': '((current_balance - initial_balance) / initial_balance * 100)',
+    'sharpe': 'sharpe_ratio'
+}
+
+# Statement filling leaderboard_cache for one metric, built once so each
+# metric always executes the identical SQL text and hits the statement cache.
+# The inner query reads the top rows in index order; ranks and display names
+# (the username only when the trader opted in, otherwise their custom or
+# anonymous name) are computed by SQLite, ready to serve as-is.
+LEADERBOARD_RANK_SQL = {
+    metric: f'''
+        INSERT INTO leaderboard_cache (
+            metric, rank, account_id, username, display_name,
+            total_profit, win_rate, profit_factor, total_trades,
+            roi, sharpe_ratio, last_trade, is_public
+        )
+        SELECT 
+            :metric,
+            ROW_NUMBER() OVER (ORDER BY sort_key DESC),
+            account_id, username, display_name,
+            total_profit, win_rate, profit_factor, total_trades,
+            roi, sharpe_ratio, last_updated, is_public
+        FROM (
+            SELECT 
+                ts.account_id, ts.username, ts.total_profit, ts.win_rate,
+                ts.profit_factor, ts.total_trades, ts.sharpe_ratio,
+                ts.last_updated, ts.is_public,
+                CASE WHEN up.show_username THEN ts.username
+                     ELSE COALESCE(NULLIF(up.display_name, ''), ts.anon_name)
+                END as display_name,
+                ((ts.current_balance - ts.initial_balance) / ts.initial_balance * 100) as roi,
+                {order_by} as sort_key
+            FROM trader_stats ts
+            LEFT JOIN user_preferences up ON ts.account_id = up.account_id
+            WHERE ts.is_public = 1 AND ts.total_trades > 0
+            ORDER BY {order_by} DESC
+            LIMIT :limit
+        )
+    '''
+    for metric, order_by in LEADERBOARD_ORDER_BY.items()
+}
+
+# Counters kept in the single overview_cache row, with each trader_stats
+# row's contribution ({r} is NEW or OLD inside the maintaining triggers).
+# Only traders with total_trades > 0 are counted, like the old scan.
+OVERVIEW_COUNTERS = (
+    ('total_traders', 'INTEGER', '1'),
+    ('total_trades', 'INTEGER', 'IFNULL({r}.total_trades, 0)'),
+    ('total_profit', 'REAL', 'IFNULL({r}.total_profit, 0)'),
+    ('sum_win_rate', 'REAL', 'IFNULL({r}.win_rate, 0)'),
+    ('win_rate_count', 'INTEGER', '({r}.win_rate IS NOT NULL)'),
+    ('sum_profit_factor', 'REAL', 'IFNULL({r}.profit_factor, 0)'),
+    ('profit_factor_count', 'INTEGER', '({r}.profit_factor IS NOT NULL)'),
+)
+
+# Precomputed leaderboard: ranks kept per metric and refresh interval
+LEADERBOARD_CACHE_SIZE = int(os.getenv('LEADERBOARD_CACHE_SIZE', 1000))
+LEADERBOARD_REFRESH_SECONDS = int(os.getenv('LEADERBOARD_REFRESH_SECONDS', 30))
+LEADERBOARD_DEFAULT_LIMIT = 50
+
+# Planner statistics are rebuilt with ANALYZE this often by the refresh thread
+ANALYZE_INTERVAL_SECONDS = int(os.getenv('ANALYZE_INTERVAL_SECONDS', 24 * 60 * 60))
+
+# Trades are written behind the request in batches of up to
+# TRADE_BATCH_SIZE rows, or whatever arrived within TRADE_FLUSH_INTERVAL
+TRADE_BATCH_SIZE = 500
+TRADE_FLUSH_INTERVAL = 0.1  # seconds
+
+TRADE_COLUMNS = (
+    'trade_id', 'account_id', 'signal_number', 'symbol', 'action',
+    'entry_time', 'exit_time', 'entry_price', 'exit_price', 'lots',
+    'profit', 'pips', 'duration_hours', 'trade_type', 'risk_level'
+)
+
+BACKTEST_COLUMNS = (
+    'backtest_id', 'account_id', 'strategy_name', 'start_date', 'end_date',
+    'initial_balance', 'final_balance', 'total_trades', 'winning_trades',
+    'win_rate', 'profit_factor', 'max_drawdown', 'sharpe_ratio',
+    'parameters', 'equity_curve', 'created_at'
+)
+
+# Fields returned by /api/stats/<account_id>; internal columns such as the
+# precomputed anon_name stay out of the payload
+TRADER_STATS_COLUMNS = (
+    'account_id', 'username', 'display_name', 'total_trades', 'winning_trades',
+    'losing_trades', 'total_profit', 'total_loss', 'win_rate', 'profit_factor',
+    'average_win', 'average_loss', 'largest_win', 'largest_loss',
+    'consecutive_wins', 'consecutive_losses', 'current_streak', 'max_win_streak',
+    'max_loss_streak', 'average_trade_duration', 'total_lots_traded',
+    'sharpe_ratio', 'max_drawdown', 'recovery_factor', 'initial_balance',
+    'current_balance', 'peak_balance', 'is_public', 'last_updated'
+)
+
+# Python types a trade value may have; SQLite integers are signed 64-bit
+TRADE_VALUE_TYPES = (str, int, float, type(None))
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+INSERT_TRADE_SQL = '''
+    INSERT INTO trades (
+        trade_id, account_id, signal_number, symbol, action,
+        entry_time, exit_time, entry_price, exit_price, lots,
+        profit, pips, duration_hours, trade_type, risk_level
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(trade_id) DO UPDATE SET
+        account_id = excluded.account_id,
+        signal_number = excluded.signal_number,
+        symbol = excluded.symbol,
+        action = excluded.action,
+        entry_time = excluded.entry_time,
+        exit_time = excluded.exit_time,
+        entry_price = excluded.entry_price,
+        exit_price = excluded.exit_price,
+        lots = excluded.lots,
+        profit = excluded.profit,
+        pips = excluded.pips,
+        duration_hours = excluded.duration_hours,
+        trade_type = excluded.trade_type,
+        risk_level = excluded.risk_level
+'''
+
+# Defaults for stats missing from an update, bound with the payload by name
+TRADER_STATS_DEFAULTS = {
+    'total_trades': 0,
+    'winning_trades': 0,
+    'losing_trades': 0,
+    'total_profit': 0,
+    'total_loss': 0,
+    'win_rate': 0,
+    'profit_factor': 0,
+    'average_win': 0,
+    'average_loss': 0,
+    'largest_win': 0,
+    'largest_loss': 0,
+    'consecutive_wins': 0,
+    'consecutive_losses': 0,
+    'average_trade_duration': 0,
+    'total_lots_traded': 0,
+    'sharpe_ratio': None,
+    'max_drawdown': 0,
+    'recovery_factor': 0,
+    'current_balance': 10000
+}
+
+UPSERT_TRADER_STATS_SQL = '''
+    INSERT INTO trader_stats (
+        account_id, username, total_trades, winning_trades, losing_trades,
+        total_profit, total_loss, win_rate, profit_factor, average_win,
+        average_loss, largest_win, largest_loss, consecutive_wins,
+        consecutive_losses, average_trade_duration, total_lots_traded,
+        sharpe_ratio, max_drawdown, recovery_factor, current_balance, anon_name
+    ) VALUES (
+        :account_id, :username, :total_trades, :winning_trades, :losing_trades,
+        :total_profit, :total_loss, :win_rate, :profit_factor, :average_win,
+        :average_loss, :largest_win, :largest_loss, :consecutive_wins,
+        :consecutive_losses, :average_trade_duration, :total_lots_traded,
+        :sharpe_ratio, :max_drawdown, :recovery_factor, :current_balance, :anon_name
+    )
+    ON CONFLICT(account_id) DO UPDATE SET
+        total_trades = :total_trades,
+        winning_trades = :winning_trades,
+        losing_trades = :losing_trades,
+        total_profit = :total_profit,
+        total_loss = :total_loss,
+        win_rate = :win_rate,
+        profit_factor = :profit_factor,
+        average_win = :average_win,
+        average_loss = :average_loss,
+        largest_win = :largest_win,
+        largest_loss = :largest_loss,
+        consecutive_wins = :consecutive_wins,
+        consecutive_losses = :consecutive_losses,
+        average_trade_duration = :average_trade_duration,
+        total_lots_traded = :total_lots_traded,
+        sharpe_ratio = :sharpe_ratio,
+        max_drawdown = :max_drawdown,
+        recovery_factor = :recovery_factor,
+        current_balance = :current_balance,
+        last_updated = CURRENT_TIMESTAMP
+'''
+
+def load_stored_json(text: Optional[str]):
+    """Parse a JSON document stored in the database. Rows written before
+    orjson may contain NaN or Infinity, which only the stdlib parser
+    accepts; orjson writes those back out as null."""
+    if text is None:
+        return None
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+# orjson options for every document the dashboard writes, whether to a
+# response or to the database
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# In-process cache for read-heavy GET endpoints
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 30))
+
+# Proxied bot API signal history is served from memory for this long, then
+# revalidated upstream with If-None-Match
+SIGNAL_HISTORY_TTL = int(os.getenv('SIGNAL_HISTORY_TTL', 15))
+
 @dataclass
 class TraderStats:
     account_id: str
@@ -93,18 +329,107 @@ class LeaderboardEntry:
     last_trade: str
     is_public: bool  # Privacy setting
 
+@dataclass(slots=True)
+class SignalRecord:
+    """One signal in the signal history fallback; orjson serializes it as an object"""
+    signal_number: int
+    symbol: str
+    action: str
+    entry_price: Optional[float]
+    stop_loss: Optional[float]
+    exit_price: Optional[float]
+    tp1: Optional[float]
+    tp2: Optional[float]
+    tp3: Optional[float]
+    tp4: Optional[float]
+    tp5: Optional[float]
+    tp6: Optional[float]
+    is_reentry: bool
+    risk_level: str
+    created_at: str
+    exit_date: Optional[str]
+    tp_hits: List[int]
+    highest_tp: int
+    outcome: str
+    outcome_class: str  # 'win' or 'loss'
+    pips: float
+    profit_percent: float
+    tp_breakdown: List[Dict]  # [{tp_level, price, pips, partial_exit_percent, profit_percent}]
+
+def anonymous_name(account_id: str) -> str:
+    """Stable anonymous leaderboard name, stored with the trader on write"""
+    return f"Trader_{hashlib.md5(account_id.encode()).hexdigest()[:8]}"
+
 class DashboardDatabase:
     """Database manager for dashboard"""
     
     def __init__(self, db_path: str = DASHBOARD_DB):
         self.db_path = db_path
+        # One long-lived connection per worker thread, so SQLite's page cache
+        # stays warm between requests instead of being rebuilt on every call
+        self._pool = ConnectionPool(db_path, row_factory=sqlite3.Row)
+        self._stop_refresh = threading.Event()
+        self._trade_queue = queue.Queue()
+        # Serialized /api/leaderboard bodies keyed by (metric, limit), replaced
+        # wholesale on every leaderboard_cache refresh
+        self._leaderboard_bodies: Dict[tuple, bytes] = {}
         self.init_database()
+        
+        self._trade_thread = threading.Thread(target=self._trade_writer, name='trade-writer', daemon=True)
+        self._trade_thread.start()
+        atexit.register(self.close)
+    
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get this thread's pooled connection, opening it on first use"""
+        return self._pool.get()
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed writes in a single BEGIN IMMEDIATE ... COMMIT block"""
+        conn = self._get_conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except Exception:
+            # Also covers a failed COMMIT (e.g. SQLITE_BUSY), so the pooled
+            # connection is never left inside an open transaction
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+    
+    def close(self):
+        """Stop background work and close all pooled connections"""
+        self._stop_refresh.set()
+        if self._trade_thread.is_alive():
+            # Let the writer flush whatever is still queued
+            self._trade_queue.put(None)
+            self._trade_thread.join(timeout=10)
+        for conn in self._pool.detach_all():
+            try:
+                # Let SQLite refresh any statistics this connection's queries
+                # showed to be stale before it goes away
+                conn.execute('PRAGMA optimize')
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing database connection: {e}")
     
     def init_database(self):
         """Initialize database schema"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._get_conn()
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            conn.execute('PRAGMA journal_mode=WAL')
+        
+        with self._transaction() as conn:
+            self._create_schema(conn.cursor())
         
+        # Refresh planner statistics so the new indexes get picked up
+        conn.execute('ANALYZE')
+        logger.info("Dashboard database initialized")
+    
+    def _create_schema(self, cursor: sqlite3.Cursor):
+        """Create tables if they don't exist yet"""
         # Trader statistics table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS trader_stats (
@@ -136,10 +461,21 @@ class DashboardDatabase:
                 current_balance REAL DEFAULT 10000,
                 peak_balance REAL DEFAULT 10000,
                 is_public INTEGER DEFAULT 1,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                anon_name TEXT
             )
         ''')
         
+        # Older databases predate the precomputed anonymous name
+        cursor.execute('PRAGMA table_info(trader_stats)')
+        if 'anon_name' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE trader_stats ADD COLUMN anon_name TEXT')
+        cursor.execute('SELECT account_id FROM trader_stats WHERE anon_name IS NULL')
+        cursor.executemany(
+            'UPDATE trader_stats SET anon_name = ? WHERE account_id = ?',
+            [(anonymous_name(row[0]), row[0]) for row in cursor.fetchall()]
+        )
+        
         # Individual trades table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS trades (
@@ -214,186 +550,214 @@ class DashboardDatabase:
             )
         ''')
         
-        conn.commit()
-        conn.close()
-        logger.info("Dashboard database initialized")
+        # Precomputed leaderboard (rebuilt by refresh_leaderboard_cache)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS leaderboard_cache (
+                metric TEXT,
+                rank INTEGER,
+                account_id TEXT,
+                username TEXT,
+                display_name TEXT,
+                total_profit REAL,
+                win_rate REAL,
+                profit_factor REAL,
+                total_trades INTEGER,
+                roi REAL,
+                sharpe_ratio REAL,
+                last_trade TIMESTAMP,
+                is_public INTEGER,
+                PRIMARY KEY (metric, rank)
+            ) WITHOUT ROWID
+        ''')
+        
+        self._create_overview_cache(cursor)
+        
+        # Leaderboard indexes - partial on the leaderboard filter so each
+        # metric can be read in order and stop at LIMIT instead of sorting.
+        # No index leads with total_trades: the planner would use it for the
+        # "total_trades > 0" filter and fall back to sorting every metric.
+        for name, column in (
+            ('idx_stats_profit', 'total_profit'),
+            ('idx_stats_win_rate', 'win_rate'),
+            ('idx_stats_profit_factor', 'profit_factor'),
+            ('idx_stats_sharpe', 'sharpe_ratio'),
+            ('idx_stats_roi', '((current_balance - initial_balance) / initial_balance * 100)'),
+        ):
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS {name} ON trader_stats({column} DESC)
+                WHERE is_public = 1 AND total_trades > 0
+            ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_trades_account_entry
+            ON trades(account_id, entry_time DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_backtests_account_created
+            ON backtest_results(account_id, created_at DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_backtests_created
+            ON backtest_results(created_at DESC)
+        ''')
+    
+    def _create_overview_cache(self, cursor: sqlite3.Cursor):
+        """Create the overview counters row and the triggers that maintain it"""
+        columns = [name for name, _, _ in OVERVIEW_COUNTERS]
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS overview_cache (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                {', '.join(f'{name} {type_} NOT NULL DEFAULT 0' for name, type_, _ in OVERVIEW_COUNTERS)}
+            )
+        ''')
+        
+        def contribution(ref: str, sign: str) -> Dict[str, str]:
+            weight = f'IFNULL({ref}.total_trades > 0, 0)'
+            return {name: f' {sign} {weight} * {expr.format(r=ref)}'
+                    for name, _, expr in OVERVIEW_COUNTERS}
+        
+        added, removed = contribution('NEW', '+'), contribution('OLD', '-')
+        triggers = (
+            ('trg_overview_insert', 'INSERT', [added]),
+            ('trg_overview_delete', 'DELETE', [removed]),
+            ('trg_overview_update',
+             'UPDATE OF total_trades, total_profit, win_rate, profit_factor',
+             [removed, added]),
+        )
+        for name, event, deltas in triggers:
+            assignments = ',\n                    '.join(
+                f"{col} = {col}{''.join(delta[col] for delta in deltas)}" for col in columns
+            )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {name}
+                AFTER {event} ON trader_stats
+                BEGIN
+                    UPDATE overview_cache SET
+                    {assignments}
+                    WHERE id = 1;
+                END
+            ''')
+        
+        # Resync from a full scan on startup so the counters can never drift
+        # for longer than one deploy (e.g. rows edited with triggers absent)
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO overview_cache (id, {', '.join(columns)})
+            SELECT 1,
+                COUNT(*),
+                IFNULL(SUM(total_trades), 0),
+                IFNULL(SUM(total_profit), 0),
+                IFNULL(SUM(win_rate), 0),
+                COUNT(win_rate),
+                IFNULL(SUM(profit_factor), 0),
+                COUNT(profit_factor)
+            FROM trader_stats
+            WHERE total_trades > 0
+        ''')
     
     def get_trader_stats(self, account_id: str) -> Optional[Dict]:
         """Get statistics for a specific trader"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._get_conn().cursor()
         
-        cursor.execute('''
-            SELECT * FROM trader_stats WHERE account_id = ?
+        cursor.execute(f'''
+            SELECT {', '.join(TRADER_STATS_COLUMNS)} FROM trader_stats WHERE account_id = ?
         ''', (account_id,))
         
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return dict(row)
         return None
     
     def update_trader_stats(self, account_id: str, stats: Dict):
-        """Update trader statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check if trader exists
-        cursor.execute('SELECT account_id FROM trader_stats WHERE account_id = ?', (account_id,))
-        exists = cursor.fetchone()
-        
-        if exists:
-            # Update existing
-            cursor.execute('''
-                UPDATE trader_stats SET
-                    total_trades = ?,
-                    winning_trades = ?,
-                    losing_trades = ?,
-                    total_profit = ?,
-                    total_loss = ?,
-                    win_rate = ?,
-                    profit_factor = ?,
-                    average_win = ?,
-                    average_loss = ?,
-                    largest_win = ?,
-                    largest_loss = ?,
-                    consecutive_wins = ?,
-                    consecutive_losses = ?,
-                    average_trade_duration = ?,
-                    total_lots_traded = ?,
-                    sharpe_ratio = ?,
-                    max_drawdown = ?,
-                    recovery_factor = ?,
-                    current_balance = ?,
-                    last_updated = CURRENT_TIMESTAMP
-                WHERE account_id = ?
-            ''', (
-                stats.get('total_trades', 0),
-                stats.get('winning_trades', 0),
-                stats.get('losing_trades', 0),
-                stats.get('total_profit', 0),
-                stats.get('total_loss', 0),
-                stats.get('win_rate', 0),
-                stats.get('profit_factor', 0),
-                stats.get('average_win', 0),
-                stats.get('average_loss', 0),
-                stats.get('largest_win', 0),
-                stats.get('largest_loss', 0),
-                stats.get('consecutive_wins', 0),
-                stats.get('consecutive_losses', 0),
-                stats.get('average_trade_duration', 0),
-                stats.get('total_lots_traded', 0),
-                stats.get('sharpe_ratio'),
-                stats.get('max_drawdown', 0),
-                stats.get('recovery_factor', 0),
-                stats.get('current_balance', 10000),
-                account_id
-            ))
-        else:
-            # Insert new
-            cursor.execute('''
-                INSERT INTO trader_stats (
-                    account_id, username, total_trades, winning_trades, losing_trades,
-                    total_profit, total_loss, win_rate, profit_factor, average_win,
-                    average_loss, largest_win, largest_loss, consecutive_wins,
-                    consecutive_losses, average_trade_duration, total_lots_traded,
-                    sharpe_ratio, max_drawdown, recovery_factor, current_balance
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                account_id,
-                stats.get('username', f'Trader_{account_id[:8]}'),
-                stats.get('total_trades', 0),
-                stats.get('winning_trades', 0),
-                stats.get('losing_trades', 0),
-                stats.get('total_profit', 0),
-                stats.get('total_loss', 0),
-                stats.get('win_rate', 0),
-                stats.get('profit_factor', 0),
-                stats.get('average_win', 0),
-                stats.get('average_loss', 0),
-                stats.get('largest_win', 0),
-                stats.get('largest_loss', 0),
-                stats.get('consecutive_wins', 0),
-                stats.get('consecutive_losses', 0),
-                stats.get('average_trade_duration', 0),
-                stats.get('total_lots_traded', 0),
-                stats.get('sharpe_ratio'),
-                stats.get('max_drawdown', 0),
-                stats.get('recovery_factor', 0),
-                stats.get('current_balance', 10000)
-            ))
-        
-        conn.commit()
-        conn.close()
+        """Update trader statistics, creating the trader if needed"""
+        params = {
+            **TRADER_STATS_DEFAULTS,
+            'username': f'Trader_{account_id[:8]}',
+            **stats,
+            'account_id': account_id,
+            'anon_name': anonymous_name(account_id)
+        }
+        with self._transaction() as conn:
+            conn.execute(UPSERT_TRADER_STATS_SQL, params)
     
-    def get_leaderboard(self, metric: str = 'profit', limit: int = 50) -> List[Dict]:
-        """Get leaderboard sorted by specified metric"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Determine sorting column
-        order_by_map = {
-            'profit': 'total_profit',
-            'win_rate': 'win_rate',
-            'profit_factor': 'profit_factor',
-            'trades': 'total_trades',
-            'roi': '((current_balance - initial_balance) / initial_balance * 100)',
-            'sharpe': 'sharpe_ratio'
+    def refresh_leaderboard_cache(self):
+        """Rebuild the precomputed leaderboard_cache table for every metric"""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM leaderboard_cache')
+            for metric, sql in LEADERBOARD_RANK_SQL.items():
+                conn.execute(sql, {'metric': metric, 'limit': LEADERBOARD_CACHE_SIZE})
+        
+        # Pre-warm the default page of every metric from the new ranks
+        self._leaderboard_bodies = {
+            (metric, LEADERBOARD_DEFAULT_LIMIT): self._serialize_leaderboard(metric, LEADERBOARD_DEFAULT_LIMIT)
+            for metric in LEADERBOARD_ORDER_BY
         }
+    
+    def start_leaderboard_refresh(self, interval: float = LEADERBOARD_REFRESH_SECONDS):
+        """Keep leaderboard_cache and planner statistics fresh from a background thread"""
+        def run():
+            next_analyze = time.monotonic() + ANALYZE_INTERVAL_SECONDS
+            while not self._stop_refresh.wait(interval):
+                try:
+                    self.refresh_leaderboard_cache()
+                except Exception as e:
+                    logger.error(f"Error refreshing leaderboard cache: {e}")
+                
+                if time.monotonic() >= next_analyze:
+                    next_analyze = time.monotonic() + ANALYZE_INTERVAL_SECONDS
+                    try:
+                        self._get_conn().execute('ANALYZE')
+                    except sqlite3.Error as e:
+                        logger.error(f"Error analyzing dashboard database: {e}")
+        
+        self.refresh_leaderboard_cache()
+        thread = threading.Thread(target=run, name='leaderboard-refresh', daemon=True)
+        thread.start()
+    
+    def get_leaderboard(self, metric: str = 'profit', limit: int = LEADERBOARD_DEFAULT_LIMIT) -> List[Dict]:
+        """Get leaderboard sorted by specified metric"""
+        cursor = self._get_conn().cursor()
         
-        order_by = order_by_map.get(metric, 'total_profit')
+        if metric not in LEADERBOARD_ORDER_BY:
+            metric = 'profit'
         
-        cursor.execute(f'''
+        cursor.execute('''
             SELECT 
-                ts.*,
-                up.show_username,
-                up.display_name as custom_display_name,
-                ((ts.current_balance - ts.initial_balance) / ts.initial_balance * 100) as roi
-            FROM trader_stats ts
-            LEFT JOIN user_preferences up ON ts.account_id = up.account_id
-            WHERE ts.is_public = 1 AND ts.total_trades > 0
-            ORDER BY {order_by} DESC
+                rank, account_id, username, display_name, total_profit,
+                win_rate, profit_factor, total_trades, roi, sharpe_ratio,
+                last_trade, is_public
+            FROM leaderboard_cache
+            WHERE metric = ?
+            ORDER BY rank
             LIMIT ?
-        ''', (limit,))
+        ''', (metric, limit))
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        leaderboard = []
-        for idx, row in enumerate(rows, 1):
-            entry = dict(row)
-            entry['rank'] = idx
-            
-            # Anonymize if needed
-            if not entry.get('show_username'):
-                if entry.get('custom_display_name'):
-                    entry['display_name'] = entry['custom_display_name']
-                else:
-                    # Generate anonymous name
-                    hash_obj = hashlib.md5(entry['account_id'].encode())
-                    entry['display_name'] = f"Trader_{hash_obj.hexdigest()[:8]}"
-            else:
-                entry['display_name'] = entry.get('username', f"Trader_{entry['account_id'][:8]}")
-            
-            leaderboard.append(entry)
-        
-        return leaderboard
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def _serialize_leaderboard(self, metric: str, limit: int) -> bytes:
+        leaderboard = self.get_leaderboard(metric, limit)
+        return orjson.dumps({
+            "status": "success",
+            "data": leaderboard,
+            "metric": metric,
+            "count": len(leaderboard)
+        })
+    
+    def get_leaderboard_body(self, metric: str = 'profit', limit: int = LEADERBOARD_DEFAULT_LIMIT) -> bytes:
+        """Get the serialized /api/leaderboard response body, cached until the next refresh"""
+        key = (metric, limit)
+        body = self._leaderboard_bodies.get(key)
+        if body is None:
+            body = self._serialize_leaderboard(metric, limit)
+            # Only known metrics are kept so arbitrary query strings can't grow the cache
+            if metric in LEADERBOARD_ORDER_BY and 0 < limit <= LEADERBOARD_CACHE_SIZE:
+                self._leaderboard_bodies[key] = body
+        return body
     
     def record_trade(self, trade_data: Dict):
-        """Record an individual trade"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO trades (
-                trade_id, account_id, signal_number, symbol, action,
-                entry_time, exit_time, entry_price, exit_price, lots,
-                profit, pips, duration_hours, trade_type, risk_level
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """Queue an individual trade for the batched trade writer, raising
+        ValueError for values SQLite can't store"""
+        row = (
             trade_data['trade_id'],
             trade_data['account_id'],
             trade_data.get('signal_number'),
@@ -409,96 +773,250 @@ class DashboardDatabase:
             trade_data.get('duration_hours', 0),
             trade_data.get('trade_type'),
             trade_data.get('risk_level')
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
+        # Checked here, while the request can still be rejected: once queued,
+        # an unbindable value would only fail inside the writer's batch
+        invalid = [
+            column for column, value in zip(TRADE_COLUMNS, row)
+            if not isinstance(value, TRADE_VALUE_TYPES)
+            or (isinstance(value, int) and not SQLITE_INT_MIN <= value <= SQLITE_INT_MAX)
+        ]
+        if invalid:
+            raise ValueError(f"Invalid value for {', '.join(invalid)}")
+        self._trade_queue.put(row)
+    
+    def flush_trades(self):
+        """Block until every queued trade has been written"""
+        self._trade_queue.join()
     
-    def get_trades(self, account_id: str, limit: int = 100) -> List[Dict]:
-        """Get recent trades for an account"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def _trade_writer(self):
+        """Drain the trade queue in batches, one transaction per batch"""
+        stopping = False
+        while not stopping:
+            item = self._trade_queue.get()
+            if item is None:
+                self._trade_queue.task_done()
+                break
+            
+            batch = [item]
+            deadline = time.monotonic() + TRADE_FLUSH_INTERVAL
+            while len(batch) < TRADE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._trade_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._trade_queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                with self._transaction() as conn:
+                    conn.executemany(INSERT_TRADE_SQL, batch)
+            except Exception as e:
+                # Retry one trade per transaction so only the bad rows are lost
+                logger.warning(f"Error writing {len(batch)} trades as a batch, retrying individually: {e}")
+                for row in batch:
+                    try:
+                        with self._transaction() as conn:
+                            conn.execute(INSERT_TRADE_SQL, row)
+                    except Exception as e:
+                        logger.error(f"Error writing trade {row[0]!r}: {e}")
+            finally:
+                for _ in batch:
+                    self._trade_queue.task_done()
+    
+    def get_trades(self, account_id: str, limit: int = 100) -> Iterator[Dict]:
+        """Get recent trades for an account as lazily-read dicts"""
+        cursor = self._get_conn().cursor()
+        # Plain tuples keyed by TRADE_COLUMNS, so REAL values reach orjson
+        # as Python floats and round-trip exactly
+        cursor.row_factory = None
         
-        cursor.execute('''
-            SELECT * FROM trades 
+        cursor.execute(f'''
+            SELECT {', '.join(TRADE_COLUMNS)} FROM trades 
             WHERE account_id = ? 
             ORDER BY entry_time DESC 
             LIMIT ?
         ''', (account_id, limit))
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
+        return (dict(zip(TRADE_COLUMNS, row)) for row in cursor)
     
     def save_backtest(self, backtest_data: Dict):
         """Save backtest result"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO backtest_results (
-                backtest_id, account_id, strategy_name, start_date, end_date,
-                initial_balance, final_balance, total_trades, winning_trades,
-                win_rate, profit_factor, max_drawdown, sharpe_ratio,
-                parameters, equity_curve
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            backtest_data['backtest_id'],
-            backtest_data['account_id'],
-            backtest_data['strategy_name'],
-            backtest_data['start_date'],
-            backtest_data['end_date'],
-            backtest_data['initial_balance'],
-            backtest_data['final_balance'],
-            backtest_data['total_trades'],
-            backtest_data['winning_trades'],
-            backtest_data['win_rate'],
-            backtest_data['profit_factor'],
-            backtest_data['max_drawdown'],
-            backtest_data['sharpe_ratio'],
-            json.dumps(backtest_data.get('parameters', {})),
-            json.dumps(backtest_data.get('equity_curve', []))
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO backtest_results (
+                    backtest_id, account_id, strategy_name, start_date, end_date,
+                    initial_balance, final_balance, total_trades, winning_trades,
+                    win_rate, profit_factor, max_drawdown, sharpe_ratio,
+                    parameters, equity_curve
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                backtest_data['backtest_id'],
+                backtest_data['account_id'],
+                backtest_data['strategy_name'],
+                backtest_data['start_date'],
+                backtest_data['end_date'],
+                backtest_data['initial_balance'],
+                backtest_data['final_balance'],
+                backtest_data['total_trades'],
+                backtest_data['winning_trades'],
+                backtest_data['win_rate'],
+                backtest_data['profit_factor'],
+                backtest_data['max_drawdown'],
+                backtest_data['sharpe_ratio'],
+                orjson.dumps(backtest_data.get('parameters', {}), option=ORJSON_OPTIONS).decode(),
+                orjson.dumps(backtest_data.get('equity_curve', []), option=ORJSON_OPTIONS).decode()
+            ))
     
     def get_backtests(self, account_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
         """Get backtest results"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._get_conn().cursor()
+        cursor.row_factory = None
         
+        columns = ', '.join(BACKTEST_COLUMNS)
         if account_id:
-            cursor.execute('''
-                SELECT * FROM backtest_results 
+            cursor.execute(f'''
+                SELECT {columns} FROM backtest_results 
                 WHERE account_id = ? 
                 ORDER BY created_at DESC 
                 LIMIT ?
             ''', (account_id, limit))
         else:
-            cursor.execute('''
-                SELECT * FROM backtest_results 
+            cursor.execute(f'''
+                SELECT {columns} FROM backtest_results 
                 ORDER BY created_at DESC 
                 LIMIT ?
             ''', (limit,))
         
-        rows = cursor.fetchall()
-        conn.close()
-        
+        # Parsed eagerly so a bad stored document fails the request before
+        # any of the response has been streamed
         results = []
-        for row in rows:
-            result = dict(row)
-            result['parameters'] = json.loads(result['parameters'])
-            result['equity_curve'] = json.loads(result['equity_curve'])
+        for row in cursor:
+            result = dict(zip(BACKTEST_COLUMNS, row))
+            result['parameters'] = load_stored_json(result['parameters'])
+            result['equity_curve'] = load_stored_json(result['equity_curve'])
             results.append(result)
         
         return results
+    
+    def get_overview(self) -> Dict:
+        """Get overall statistics across all traders"""
+        cursor = self._get_conn().cursor()
+        
+        # Single primary-key read of the trigger-maintained counters
+        cursor.execute('''
+            SELECT 
+                total_traders,
+                -- SUM over no rows is NULL, as the full scan used to return
+                CASE WHEN total_traders > 0 THEN total_trades END as total_trades,
+                CASE WHEN total_traders > 0 THEN total_profit END as total_profit,
+                sum_win_rate / NULLIF(win_rate_count, 0) as avg_win_rate,
+                sum_profit_factor / NULLIF(profit_factor_count, 0) as avg_profit_factor
+            FROM overview_cache
+            WHERE id = 1
+        ''')
+        
+        return dict(cursor.fetchone())
 
 # Initialize database
 db = DashboardDatabase()
+db.start_leaderboard_refresh()
+
+def json_response(obj, status: int = 200):
+    """Serialize obj with orjson into a JSON response (NumPy values included)"""
+    return dashboard_app.response_class(
+        orjson.dumps(obj, option=ORJSON_OPTIONS),
+        status=status,
+        mimetype='application/json'
+    )
+
+# ==================== RESPONSE CACHE ====================
+
+class ResponseCache:
+    """Thread-safe LRU cache of serialized JSON bodies with a TTL"""
+    
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, body)
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key, body: bytes):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+response_cache = ResponseCache()
+
+# (limit, offset, symbol) -> (expires_at, etag, body). Expired entries are
+# kept so their ETag can be revalidated and served if the bot API is down.
+_signal_cache: Dict[tuple, tuple] = {}
+_signal_cache_lock = threading.Lock()
+
+def _store_signal_history(key: tuple, etag: Optional[str], body: bytes):
+    with _signal_cache_lock:
+        _signal_cache.pop(key, None)
+        _signal_cache[key] = (time.monotonic() + SIGNAL_HISTORY_TTL, etag, body)
+        while len(_signal_cache) > RESPONSE_CACHE_SIZE:
+            del _signal_cache[next(iter(_signal_cache))]
+
+def cached_response(view):
+    """Serve successful responses of a GET endpoint from response_cache"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        body = response_cache.get(key)
+        if body is not None:
+            return dashboard_app.response_class(body, mimetype='application/json')
+        
+        response = dashboard_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response_cache.set(key, response.get_data())
+        return response
+    return wrapper
+
+def stream_list_response(rows: Iterable, envelope: Dict, chunk_size: int = 100):
+    """Stream rows as {**envelope, "data": [...], "count": n} without building the list"""
+    def generate():
+        yield orjson.dumps(envelope)[:-1] + b',"data":['
+        count = 0
+        chunk = []
+        for row in rows:
+            chunk.append(orjson.dumps(row if isinstance(row, dict) else dict(row)))
+            count += 1
+            if len(chunk) == chunk_size:
+                yield (b',' if count > chunk_size else b'') + b','.join(chunk)
+                chunk = []
+        if chunk:
+            yield (b',' if count > len(chunk) else b'') + b','.join(chunk)
+        yield b'],"count":' + str(count).encode() + b'}'
+    
+    return dashboard_app.response_class(generate(), mimetype='application/json')
 
 # ==================== API ENDPOINTS ====================
 
@@ -513,26 +1031,27 @@ def serve_static(path):
     return send_from_directory('dashboard_static', path)
 
 @dashboard_app.route('/api/stats/<account_id>', methods=['GET'])
+@cached_response
 def get_trader_stats(account_id):
     """Get statistics for a specific trader"""
     try:
         stats = db.get_trader_stats(account_id)
         if stats:
-            return jsonify({
+            return json_response({
                 "status": "success",
                 "data": stats
             })
         else:
-            return jsonify({
+            return json_response({
                 "status": "error",
                 "message": "Trader not found"
-            }), 404
+            }, 404)
     except Exception as e:
         logger.error(f"Error getting trader stats: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/stats', methods=['POST'])
 def update_trader_stats():
@@ -542,45 +1061,41 @@ def update_trader_stats():
         account_id = data.get('account_id')
         
         if not account_id:
-            return jsonify({
+            return json_response({
                 "status": "error",
                 "message": "account_id required"
-            }), 400
+            }, 400)
         
         db.update_trader_stats(account_id, data)
+        response_cache.clear()
         
-        return jsonify({
+        return json_response({
             "status": "success",
             "message": "Stats updated"
         })
     except Exception as e:
         logger.error(f"Error updating trader stats: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
     """Get leaderboard"""
     try:
         metric = request.args.get('metric', 'profit')
-        limit = int(request.args.get('limit', 50))
+        limit = int(request.args.get('limit', LEADERBOARD_DEFAULT_LIMIT))
         
-        leaderboard = db.get_leaderboard(metric, limit)
+        body = db.get_leaderboard_body(metric, limit)
         
-        return jsonify({
-            "status": "success",
-            "data": leaderboard,
-            "metric": metric,
-            "count": len(leaderboard)
-        })
+        return dashboard_app.response_class(body, mimetype='application/json')
     except Exception as e:
         logger.error(f"Error getting leaderboard: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/trades/<account_id>', methods=['GET'])
 def get_trades(account_id):
@@ -589,17 +1104,13 @@ def get_trades(account_id):
         limit = int(request.args.get('limit', 100))
         trades = db.get_trades(account_id, limit)
         
-        return jsonify({
-            "status": "success",
-            "data": trades,
-            "count": len(trades)
-        })
+        return stream_list_response(trades, {"status": "success"})
     except Exception as e:
         logger.error(f"Error getting trades: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/trades', methods=['POST'])
 def record_trade():
@@ -608,23 +1119,29 @@ def record_trade():
         trade_data = request.get_json()
         
         if not trade_data.get('trade_id') or not trade_data.get('account_id'):
-            return jsonify({
+            return json_response({
                 "status": "error",
                 "message": "trade_id and account_id required"
-            }), 400
+            }, 400)
         
         db.record_trade(trade_data)
+        response_cache.clear()
         
-        return jsonify({
+        return json_response({
             "status": "success",
             "message": "Trade recorded"
         })
+    except ValueError as e:
+        return json_response({
+            "status": "error",
+            "message": str(e)
+        }, 400)
     except Exception as e:
         logger.error(f"Error recording trade: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/backtests', methods=['GET'])
 def get_backtests():
@@ -635,17 +1152,13 @@ def get_backtests():
         
         backtests = db.get_backtests(account_id, limit)
         
-        return jsonify({
-            "status": "success",
-            "data": backtests,
-            "count": len(backtests)
-        })
+        return stream_list_response(backtests, {"status": "success"})
     except Exception as e:
         logger.error(f"Error getting backtests: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/backtests', methods=['POST'])
 def save_backtest():
@@ -654,57 +1167,41 @@ def save_backtest():
         backtest_data = request.get_json()
         
         if not backtest_data.get('backtest_id') or not backtest_data.get('account_id'):
-            return jsonify({
+            return json_response({
                 "status": "error",
                 "message": "backtest_id and account_id required"
-            }), 400
+            }, 400)
         
         db.save_backtest(backtest_data)
         
-        return jsonify({
+        return json_response({
             "status": "success",
             "message": "Backtest saved"
         })
     except Exception as e:
         logger.error(f"Error saving backtest: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/overview', methods=['GET'])
+@cached_response
 def get_overview():
     """Get overall statistics across all traders"""
     try:
-        conn = sqlite3.connect(db.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        overview = db.get_overview()
         
-        # Overall stats
-        cursor.execute('''
-            SELECT 
-                COUNT(DISTINCT account_id) as total_traders,
-                SUM(total_trades) as total_trades,
-                SUM(total_profit) as total_profit,
-                AVG(win_rate) as avg_win_rate,
-                AVG(profit_factor) as avg_profit_factor
-            FROM trader_stats
-            WHERE total_trades > 0
-        ''')
-        
-        overview = dict(cursor.fetchone())
-        conn.close()
-        
-        return jsonify({
+        return json_response({
             "status": "success",
             "data": overview
         })
     except Exception as e:
         logger.error(f"Error getting overview: {e}")
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/signal-history', methods=['GET'])
 def get_signal_history():
@@ -715,35 +1212,99 @@ def get_signal_history():
         offset = int(request.args.get('offset', 0))
         symbol = request.args.get('symbol', None)
         
+        key = (limit, offset, symbol)
+        with _signal_cache_lock:
+            cached = _signal_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return dashboard_app.response_class(cached[2], mimetype='application/json')
+        
         # Fetch from bot's API endpoint
         params = {'limit': limit, 'offset': offset}
         if symbol:
             params['symbol'] = symbol
+        headers = {'If-None-Match': cached[1]} if cached and cached[1] else {}
         
         logger.info(f"Fetching signal history from bot API: {BOT_API_URL}/dashboard/signal_history")
         
-        response = requests.get(
-            f"{BOT_API_URL}/dashboard/signal_history",
-            params=params,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            logger.info(f"✅ Fetched {len(data.get('signals', []))} signals from bot API")
-            return jsonify(data)
+        try:
+            response = _bot_session.get(
+                f"{BOT_API_URL}/dashboard/signal_history",
+                params=params,
+                headers=headers,
+                timeout=BOT_API_TIMEOUT
+            )
+        except requests.exceptions.RequestException:
+            if cached is None:
+                raise
+            logger.warning("⚠️ Bot API unavailable - serving cached signal history")
+            return dashboard_app.response_class(cached[2], mimetype='application/json')
+        
+        if response.status_code == 304 and cached:
+            _store_signal_history(key, cached[1], cached[2])
+            return dashboard_app.response_class(cached[2], mimetype='application/json')
+        elif response.status_code == 200:
+            # Pass the upstream JSON through as-is rather than parsing and re-encoding it
+            body = response.content
+            _store_signal_history(key, response.headers.get('ETag'), body)
+            logger.info(f"✅ Fetched signal history from bot API ({len(body)} bytes)")
+            return dashboard_app.response_class(body, mimetype='application/json')
+        elif response.status_code >= 500 and cached:
+            logger.warning(f"⚠️ Bot API returned status {response.status_code} - serving cached signal history")
+            return dashboard_app.response_class(cached[2], mimetype='application/json')
         else:
             logger.error(f"❌ Bot API returned status {response.status_code}")
-            return jsonify({
+            return json_response({
                 "error": "Failed to fetch signals from bot",
                 "status": response.status_code
-            }), 502
+            }, 502)
             
     except requests.exceptions.RequestException as e:
         logger.error(f"❌ Failed to connect to bot API: {e}")
         # Fallback to local database if bot API is unavailable
         return get_signal_history_fallback()
 
+# Risk per signal as % of balance, keyed by risk_level (MEDIUM otherwise)
+RISK_PERCENT = {'LOW': 1.0, 'MEDIUM': 2.0, 'HIGH': 3.0}
+
+# Fraction of the position closed once each TP level is reached, indexed by
+# highest TP hit: 50% at TP1, 20% at TP2, 10% at TP3 and TP4, then 10% at TP5
+# or, when the signal has a TP6, 5% each at TP5 and TP6
+CUMULATIVE_EXIT = (0.0, 0.50, 0.70, 0.80, 0.90, 1.0, 1.0)
+CUMULATIVE_EXIT_WITH_TP6 = (0.0, 0.50, 0.70, 0.80, 0.90, 0.95, 1.0)
+
+# Fraction of the position closed at each TP level, TP1 first
+PARTIAL_EXIT = (0.50, 0.20, 0.10, 0.10, 0.10, 0.05)
+PARTIAL_EXIT_WITH_TP6 = (0.50, 0.20, 0.10, 0.10, 0.05, 0.05)
+
+# (symbol substrings, pip size, typical SL pips) per instrument class, in
+# match priority order; anything else is a major forex pair
+INSTRUMENT_CLASSES = (
+    (('XAU', 'GOLD'), 0.10, -30),          # $0.10 = 1 pip for gold
+    (('BTC', 'BITCOIN'), 1.0, -400),       # $1 = 1 pip for BTC
+    (('NAS', 'US100', 'NDX'), 1.0, -75),   # 1 point = 1 pip for NAS100
+    (('JPY',), 0.01, -30),                 # 0.01 = 1 pip for JPY pairs
+)
+FOREX_PIPS = (0.0001, -30)                 # 0.0001 = 1 pip for major forex pairs
+
+@lru_cache(maxsize=64)
+def instrument_pips(symbol: str) -> tuple:
+    """Pip size and typical stop-loss distance in pips for a symbol"""
+    symbol = symbol or ''
+    for markers, pip_size, sl_pips in INSTRUMENT_CLASSES:
+        if any(marker in symbol for marker in markers):
+            return pip_size, sl_pips
+    return FOREX_PIPS
+
+# One read-only connection to SIGNALS_DB per worker thread, reused across
+# fallback requests like DashboardDatabase's pool and tuned the same way
+# (memory-mapped reads, larger page cache)
+_signals_pool = ConnectionPool(
+    f'file:{SIGNALS_DB}?mode=ro',
+    pragmas=('PRAGMA query_only=ON',),
+    row_factory=sqlite3.Row,
+    uri=True
+)
+
 def get_signal_history_fallback():
     """Fallback: Read from local database if bot API is unavailable"""
     try:
@@ -752,57 +1313,71 @@ def get_signal_history_fallback():
         offset = int(request.args.get('offset', 0))
         symbol = request.args.get('symbol', None)
         
-        conn = sqlite3.connect('telegram_messages.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = _signals_pool.get().cursor()
+        # Rows are unpacked positionally below, so skip building sqlite3.Row
+        cursor.row_factory = None
         
+        # The page of signals is picked from signal_details alone, and only
+        # those signals are joined to their announced TPs. Column order is
+        # relied on by the unpacking in the loop below.
         query = '''
             SELECT 
-                sd.signal_number,
-                sd.symbol,
-                sd.action,
-                sd.entry_price,
-                sd.stop_loss,
-                sd.tp1, sd.tp2, sd.tp3, sd.tp4, sd.tp5, sd.tp6,
-                sd.is_reentry,
-                sd.risk_level,
-                sd.created_at,
+                page.signal_number,
+                page.symbol,
+                page.action,
+                page.entry_price,
+                page.stop_loss,
+                page.tp1, page.tp2, page.tp3, page.tp4, page.tp5, page.tp6,
+                page.is_reentry,
+                page.risk_level,
+                page.created_at,
                 GROUP_CONCAT(at.tp_level, ',') as tp_hits,
-                MAX(at.announced_at) as exit_date
-            FROM signal_details sd
-            LEFT JOIN announced_tps at ON sd.signal_number = at.signal_number
+                MAX(at.announced_at) as exit_date,
+                page.total_count
+            FROM (
+                SELECT sd.*, COUNT(*) OVER () as total_count
+                FROM signal_details sd
+                {where}
+                ORDER BY sd.created_at DESC, sd.signal_number DESC
+                LIMIT ? OFFSET ?
+            ) page
+            LEFT JOIN announced_tps at ON page.signal_number = at.signal_number
+            GROUP BY page.signal_number
+            ORDER BY page.created_at DESC, page.signal_number DESC
         '''
         
         params = []
+        where = ''
         if symbol:
-            query += ' WHERE sd.symbol = ?'
+            where = 'WHERE sd.symbol = ?'
             params.append(symbol)
-        
-        query += '''
-            GROUP BY sd.signal_number
-            ORDER BY sd.created_at DESC
-            LIMIT ? OFFSET ?
-        '''
         params.extend([limit, offset])
         
-        cursor.execute(query, params)
+        cursor.execute(query.format(where=where), params)
         rows = cursor.fetchall()
         
-        # Get total count
-        count_query = 'SELECT COUNT(*) FROM signal_details'
-        if symbol:
-            count_query += ' WHERE symbol = ?'
-            cursor.execute(count_query, [symbol] if symbol else [])
+        # The window count is taken over the matching signals before LIMIT, so
+        # every row carries the total; only a page past the end needs a query
+        if rows:
+            total_count = rows[0][-1]
         else:
-            cursor.execute(count_query)
-        total_count = cursor.fetchone()[0]
-        
-        conn.close()
+            count_query = 'SELECT COUNT(*) FROM signal_details'
+            if symbol:
+                count_query += ' WHERE symbol = ?'
+                cursor.execute(count_query, [symbol])
+            else:
+                cursor.execute(count_query)
+            total_count = cursor.fetchone()[0]
         
-        # Process results
+        # Process results, tallying the summary statistics in the same pass
         signals = []
-        for row in rows:
-            tp_hits_str = row['tp_hits']
+        total_pl_percent = 0
+        total_pips = 0
+        tp_counts = [0] * 7  # signals by highest TP hit, index 0 = SL
+        for (signal_number, signal_symbol, action, entry_price, stop_loss,
+             tp1, tp2, tp3, tp4, tp5, tp6, is_reentry, risk_level, created_at,
+             tp_hits_str, exit_date, _) in rows:
+            tps = (tp1, tp2, tp3, tp4, tp5, tp6)
             tp_hits = [int(x) for x in tp_hits_str.split(',')] if tp_hits_str else []
             highest_tp = max(tp_hits) if tp_hits else 0
             
@@ -810,209 +1385,132 @@ def get_signal_history_fallback():
             if highest_tp == 0:
                 outcome = 'SL Hit'
                 outcome_class = 'loss'
-                exit_price = row['stop_loss']
+                exit_price = stop_loss
             else:
                 outcome = f'TP{highest_tp} Hit'
                 outcome_class = 'win'
-                tp_key = f'tp{highest_tp}'
-                exit_price = row[tp_key]
+                exit_price = tps[highest_tp - 1]
             
             # Calculate pips and profit percentage
             pips = 0
             profit_percent = 0
             
-            # Determine risk percentage based on risk level (needed for both wins and losses)
-            risk_level = row['risk_level'] if row['risk_level'] else 'MEDIUM'
-            if risk_level == 'LOW':
-                risk_percent = 1.0
-            elif risk_level == 'HIGH':
-                risk_percent = 3.0
-            else:  # MEDIUM or default
-                risk_percent = 2.0
+            # Risk percentage (needed for both wins and losses), pip size and
+            # typical SL distance are resolved once per signal
+            risk_percent = RISK_PERCENT.get(risk_level, 2.0)
+            has_tp6 = tp6 is not None
             
             # Handle SL hit (no TPs hit)
             if highest_tp == 0:
                 # SL hit - full loss of risk amount
                 profit_percent = -risk_percent
+                pip_multiplier, sl_pips = instrument_pips(signal_symbol)
                 # Try to calculate pips if we have entry and SL
-                if exit_price and row['entry_price']:
-                    # Determine pip multiplier
-                    if 'XAU' in row['symbol'] or 'GOLD' in row['symbol']:
-                        pip_multiplier = 0.10
-                    elif 'BTC' in row['symbol'] or 'BITCOIN' in row['symbol']:
-                        pip_multiplier = 1.0
-                    elif 'NAS' in row['symbol'] or 'US100' in row['symbol'] or 'NDX' in row['symbol']:
-                        pip_multiplier = 1.0
-                    elif 'JPY' in row['symbol']:
-                        pip_multiplier = 0.01
-                    else:
-                        pip_multiplier = 0.0001
-                    
-                    # Calculate pips for loss
-                    if row['action'] == 'BUY':
-                        pips = (exit_price - row['entry_price']) / pip_multiplier
+                if exit_price and entry_price:
+                    if action == 'BUY':
+                        pips = (exit_price - entry_price) / pip_multiplier
                     else:
-                        pips = (row['entry_price'] - exit_price) / pip_multiplier
+                        pips = (entry_price - exit_price) / pip_multiplier
                 else:
                     # Estimate SL pips based on instrument type when SL price is unknown
-                    # Typical SL distances: XAUUSD ~20-50 pips, BTC ~300-500, NAS100 ~50-100, Forex ~20-40
-                    if 'XAU' in row['symbol'] or 'GOLD' in row['symbol']:
-                        pips = -30  # Typical 30 pip SL for gold
-                    elif 'BTC' in row['symbol'] or 'BITCOIN' in row['symbol']:
-                        pips = -400  # Typical 400 pip SL for BTC
-                    elif 'NAS' in row['symbol'] or 'US100' in row['symbol'] or 'NDX' in row['symbol']:
-                        pips = -75  # Typical 75 point SL for NAS100
-                    else:
-                        pips = -30  # Typical 30 pip SL for forex
+                    pips = sl_pips
             
             # Handle TP hits
-            elif exit_price and row['entry_price']:
-                # Determine pip multiplier
-                if 'XAU' in row['symbol'] or 'GOLD' in row['symbol']:
-                    pip_multiplier = 0.10  # $0.10 = 1 pip for gold
-                elif 'BTC' in row['symbol'] or 'BITCOIN' in row['symbol']:
-                    pip_multiplier = 1.0  # $1 = 1 pip for BTC
-                elif 'NAS' in row['symbol'] or 'US100' in row['symbol'] or 'NDX' in row['symbol']:
-                    pip_multiplier = 1.0  # 1 point = 1 pip for NAS100
-                elif 'JPY' in row['symbol']:
-                    pip_multiplier = 0.01  # 0.01 = 1 pip for JPY pairs
-                else:
-                    pip_multiplier = 0.0001  # 0.0001 = 1 pip for major forex pairs
-                
-                # Calculate pips
-                if row['action'] == 'BUY':
-                    pips = (exit_price - row['entry_price']) / pip_multiplier
+            elif exit_price and entry_price:
+                pip_multiplier, _ = instrument_pips(signal_symbol)
+                if action == 'BUY':
+                    pips = (exit_price - entry_price) / pip_multiplier
                 else:
-                    pips = (row['entry_price'] - exit_price) / pip_multiplier
+                    pips = (entry_price - exit_price) / pip_multiplier
                 
                 # Calculate profit % based on 500:1 leverage with partial exits
                 # Formula: (price_move / entry_price) * leverage * risk_percent * partial_exit_factor
-                price_move_percent = abs(exit_price - row['entry_price']) / row['entry_price'] * 100
+                price_move_percent = abs(exit_price - entry_price) / entry_price * 100
                 leveraged_move = price_move_percent * 500  # 500:1 leverage
                 
-                # Apply NEW partial exit strategy based on highest TP hit
-                # 50% at TP1, 20% at TP2, 10% at TP3, 10% at TP4
-                # If TP6 exists: 5% each at TP5 and TP6
-                # Otherwise: 10% at TP5
-                if highest_tp == 1:
-                    # Only TP1 hit (50% of position)
-                    profit_percent = (leveraged_move * 0.50) * (risk_percent / 100)
-                elif highest_tp == 2:
-                    # TP1 + TP2 (50% + 20% = 70% total)
-                    profit_percent = (leveraged_move * 0.70) * (risk_percent / 100)
-                elif highest_tp == 3:
-                    # TP1 + TP2 + TP3 (50% + 20% + 10% = 80% total)
-                    profit_percent = (leveraged_move * 0.80) * (risk_percent / 100)
-                elif highest_tp == 4:
-                    # TP1 + TP2 + TP3 + TP4 (50% + 20% + 10% + 10% = 90% total)
-                    profit_percent = (leveraged_move * 0.90) * (risk_percent / 100)
-                elif highest_tp == 5:
-                    # Check if TP6 exists for this signal
-                    has_tp6 = row['tp6'] is not None if 'tp6' in row.keys() else False
-                    if has_tp6:
-                        # TP1-TP5 (50% + 20% + 10% + 10% + 5% = 95% total)
-                        profit_percent = (leveraged_move * 0.95) * (risk_percent / 100)
-                    else:
-                        # All TPs hit, no TP6 (50% + 20% + 10% + 10% + 10% = 100%)
-                        profit_percent = leveraged_move * (risk_percent / 100)
-                elif highest_tp >= 6:
-                    # All TPs hit including TP6 (100%)
-                    profit_percent = leveraged_move * (risk_percent / 100)
+                cumulative_exit = (CUMULATIVE_EXIT_WITH_TP6 if has_tp6 else CUMULATIVE_EXIT)[min(highest_tp, 6)]
+                profit_percent = (leveraged_move * cumulative_exit) * (risk_percent / 100)
             
-            # Calculate detailed TP breakdown (partial profit per TP)
+            # Calculate detailed TP breakdown (partial profit per TP), with
+            # everything that is fixed for the signal looked up once
             tp_breakdown = []
-            has_tp6 = row['tp6'] is not None if 'tp6' in row.keys() else False
+            partial_exits = PARTIAL_EXIT_WITH_TP6 if has_tp6 else PARTIAL_EXIT
+            is_buy = action == 'BUY'
+            has_pips = exit_price and entry_price
+            price_digits = 3 if 'JPY' in (signal_symbol or '') else 2
+            risk_fraction = risk_percent / 100
             
-            for tp_level in range(1, highest_tp + 1):
-                tp_price = row[f'tp{tp_level}']
+            for tp_index in range(min(highest_tp, 6)):
+                tp_price = tps[tp_index]
                 if not tp_price:
                     continue
                 
                 # Calculate pips for this TP
-                if row['action'] == 'BUY':
-                    tp_pips = (tp_price - row['entry_price']) / pip_multiplier if exit_price and row['entry_price'] else 0
+                if not has_pips:
+                    tp_pips = 0
+                elif is_buy:
+                    tp_pips = (tp_price - entry_price) / pip_multiplier
                 else:
-                    tp_pips = (row['entry_price'] - tp_price) / pip_multiplier if exit_price and row['entry_price'] else 0
+                    tp_pips = (entry_price - tp_price) / pip_multiplier
                 
                 # Calculate partial profit % based on TP level
-                tp_price_move = abs(tp_price - row['entry_price']) / row['entry_price'] * 100 if row['entry_price'] else 0
+                tp_price_move = abs(tp_price - entry_price) / entry_price * 100 if entry_price else 0
                 tp_leveraged_move = tp_price_move * 500
-                
-                # Determine partial exit percentage for this TP
-                if tp_level == 1:
-                    partial_exit = 0.50  # 50% exit
-                elif tp_level == 2:
-                    partial_exit = 0.20  # 20% exit
-                elif tp_level == 3:
-                    partial_exit = 0.10  # 10% exit
-                elif tp_level == 4:
-                    partial_exit = 0.10  # 10% exit
-                elif tp_level == 5:
-                    partial_exit = 0.05 if has_tp6 else 0.10  # 5% if TP6 exists, 10% otherwise
-                elif tp_level == 6:
-                    partial_exit = 0.05  # 5% exit
-                else:
-                    partial_exit = 0
-                
-                tp_profit = (tp_leveraged_move * partial_exit) * (risk_percent / 100)
+                partial_exit = partial_exits[tp_index]
+                tp_profit = (tp_leveraged_move * partial_exit) * risk_fraction
                 
                 tp_breakdown.append({
-                    'tp_level': tp_level,
-                    'price': round(tp_price, 2 if 'JPY' not in row['symbol'] else 3),
+                    'tp_level': tp_index + 1,
+                    'price': round(tp_price, price_digits),
                     'pips': round(tp_pips, 1),
                     'partial_exit_percent': int(partial_exit * 100),
                     'profit_percent': round(tp_profit, 2)
                 })
             
-            signal = {
-                'signal_number': row['signal_number'],
-                'symbol': row['symbol'],
-                'action': row['action'],
-                'entry_price': row['entry_price'],
-                'stop_loss': row['stop_loss'],
-                'exit_price': exit_price,
-                'tp1': row['tp1'],
-                'tp2': row['tp2'],
-                'tp3': row['tp3'],
-                'tp4': row['tp4'],
-                'tp5': row['tp5'],
-                'tp6': row['tp6'] if 'tp6' in row.keys() else None,
-                'is_reentry': bool(row['is_reentry']),
-                'risk_level': row['risk_level'] if row['risk_level'] else 'MEDIUM',
-                'created_at': row['created_at'],
-                'exit_date': row['exit_date'],
-                'tp_hits': tp_hits,
-                'highest_tp': highest_tp,
-                'outcome': outcome,
-                'outcome_class': outcome_class,
-                'pips': round(pips, 1) if pips else 0,
-                'profit_percent': round(profit_percent, 2) if profit_percent else 0,
-                'tp_breakdown': tp_breakdown  # Detailed breakdown per TP
-            }
+            signal = SignalRecord(
+                signal_number=signal_number,
+                symbol=signal_symbol,
+                action=action,
+                entry_price=entry_price,
+                stop_loss=stop_loss,
+                exit_price=exit_price,
+                tp1=tp1,
+                tp2=tp2,
+                tp3=tp3,
+                tp4=tp4,
+                tp5=tp5,
+                tp6=tp6,
+                is_reentry=bool(is_reentry),
+                risk_level=risk_level if risk_level else 'MEDIUM',
+                created_at=created_at,
+                exit_date=exit_date,
+                tp_hits=tp_hits,
+                highest_tp=highest_tp,
+                outcome=outcome,
+                outcome_class=outcome_class,
+                pips=round(pips, 1) if pips else 0,
+                profit_percent=round(profit_percent, 2) if profit_percent else 0,
+                tp_breakdown=tp_breakdown  # Detailed breakdown per TP
+            )
             signals.append(signal)
+            
+            total_pl_percent += signal.profit_percent
+            total_pips += signal.pips
+            if highest_tp <= 6:
+                tp_counts[highest_tp] += 1
         
         # Calculate summary statistics
         total_signals = len(signals)
-        winning_signals = len([s for s in signals if s['outcome_class'] == 'win'])
-        losing_signals = len([s for s in signals if s['outcome_class'] == 'loss'])
+        losing_signals = tp_counts[0]
+        winning_signals = total_signals - losing_signals
         win_rate = (winning_signals / total_signals * 100) if total_signals > 0 else 0
         
-        # Calculate total P/L %
-        total_pl_percent = sum(s['profit_percent'] for s in signals)
-        total_pips = sum(s['pips'] for s in signals)
-        
         # TP distribution
-        tp_distribution = {
-            'SL': losing_signals,
-            'TP1': len([s for s in signals if s['highest_tp'] == 1]),
-            'TP2': len([s for s in signals if s['highest_tp'] == 2]),
-            'TP3': len([s for s in signals if s['highest_tp'] == 3]),
-            'TP4': len([s for s in signals if s['highest_tp'] == 4]),
-            'TP5': len([s for s in signals if s['highest_tp'] == 5]),
-            'TP6': len([s for s in signals if s['highest_tp'] == 6]),
-        }
+        tp_distribution = {'SL': losing_signals}
+        for tp_level in range(1, 7):
+            tp_distribution[f'TP{tp_level}'] = tp_counts[tp_level]
         
-        return jsonify({
+        return json_response({
             'status': 'success',
             'data': {
                 'signals': signals,
@@ -1031,10 +1529,10 @@ def get_signal_history_fallback():
         
     except Exception as e:
         logger.error(f"Error getting signal history: {e}", exc_info=True)
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 @dashboard_app.route('/api/run-backtest', methods=['POST'])
 def run_historical_backtest():
@@ -1066,7 +1564,7 @@ def run_historical_backtest():
         logger.info(f"🔬 Running backtest: ${initial_balance} @ {risk_percent}% from {start_date.date()} to {end_date.date()}")
         
         # Run backtest
-        backtester = HistoricalBacktester(db_path="telegram_messages.db")
+        backtester = HistoricalBacktester(db_path=SIGNALS_DB)
         results = backtester.run_backtest(
             start_date=start_date,
             end_date=end_date,
@@ -1098,19 +1596,25 @@ def run_historical_backtest():
                 db.save_backtest(backtest_data)
                 logger.info(f"💾 Saved backtest result for {account_id}")
         
-        return jsonify(results)
+        return json_response(results)
         
     except Exception as e:
         logger.error(f"❌ Error running backtest: {e}", exc_info=True)
-        return jsonify({
+        return json_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
-# Gunicorn entry point
+# Gunicorn entry point. Run it with threaded workers so SQLite reads and
+# bot API calls from concurrent requests overlap, e.g.
+#   gunicorn dashboard_backend:app --workers 2 --worker-class gthread --threads 16
+# Each worker thread keeps its own pooled connection; gevent workers are not
+# used because SQLite calls would block the event loop and a greenlet-local
+# pool would open a connection per request.
 app = dashboard_app
 
 if __name__ == '__main__':
+    # Development server only - see the gunicorn command above for production
     port = int(os.getenv('DASHBOARD_PORT', 5001))
     logger.info(f"Starting Trading Dashboard on port {port}")
     dashboard_app.run(host='0.0.0.0', port=port, debug=True)
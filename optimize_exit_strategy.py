@@ -9,18 +9,36 @@ The goal is to maximize total P/L % across all historical trades.
 
 import sqlite3
 import itertools
+from functools import lru_cache
 from typing import List, Dict, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from strategy_kernel import score_strategies
+
+RISK_PERCENT = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3}
+
+# Bytes of the signals DB memory-mapped while loading
+MMAP_SIZE = 268435456
+
+# Fully scored strategies (with per-signal results) kept per optimizer
+PROFIT_CACHE_SIZE = 1024
+
 
 class StrategyOptimizer:
     def __init__(self, db_path: str = "telegram_messages.db"):
         self.db_path = db_path
         self.signals = []
+        # Keyed by the strategy as a tuple, so self isn't part of the key
+        self._profit_cache = lru_cache(maxsize=PROFIT_CACHE_SIZE)(self._score_strategy)
         
     def load_signals(self):
         """Load all historical signals from the database"""
-        conn = sqlite3.connect(self.db_path)
+        self.signals = []
+        # Read-only, memory-mapped: the optimizer never writes the bot's DB
+        conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+        conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -41,27 +59,68 @@ class StrategyOptimizer:
         cursor.execute(query)
         rows = cursor.fetchall()
         
-        # Get announced TPs for each signal
+        # Get announced TPs for every signal in one grouped query
+        cursor.execute("""
+            SELECT signal_number, GROUP_CONCAT(tp_level) as tp_levels
+            FROM announced_tps
+            GROUP BY signal_number
+        """)
+        tps_by_signal = {
+            tp_row['signal_number']: sorted(int(tp) for tp in tp_row['tp_levels'].split(','))
+            for tp_row in cursor.fetchall()
+        }
+        
         for row in rows:
             signal_data = dict(row)
             
-            # Get TPs hit for this signal
-            tp_query = """
-                SELECT tp_level
-                FROM announced_tps
-                WHERE signal_number = ?
-                ORDER BY tp_level
-            """
-            cursor.execute(tp_query, (row['signal_number'],))
-            tps_hit = [tp[0] for tp in cursor.fetchall()]
+            # TPs hit for this signal
+            tps_hit = tps_by_signal.get(row['signal_number'], [])
             
             signal_data['tps_hit'] = tps_hit
-            signal_data['highest_tp'] = max(tps_hit) if tps_hit else 0
+            signal_data['highest_tp'] = tps_hit[-1] if tps_hit else 0
+            # TP1-TP6 prices by index (0.0 when unset) for the profit loops
+            signal_data['_tps'] = tuple(signal_data[f'tp{i}'] or 0.0 for i in range(1, 7))
             
             self.signals.append(signal_data)
         
         conn.close()
+        self._prepare_arrays()
+        self._profit_cache.cache_clear()
         print(f"Loaded {len(self.signals)} signals from database")
+    
+    def _prepare_arrays(self):
+        """
+        Pack the loaded signals into per-field NumPy arrays (one row per signal),
+        so a strategy can be scored against every signal at once.
+        """
+        n = len(self.signals)
+        entry = np.array([float(s['entry_price']) for s in self.signals], dtype=np.float64)
+        tps = np.array(
+            [s['_tps'] for s in self.signals],
+            dtype=np.float64
+        ).reshape(n, 6)
+        highest_tp = np.array([s['highest_tp'] for s in self.signals], dtype=np.int64)
+        
+        risk = np.array(
+            [RISK_PERCENT.get(s['risk_level'], 2) for s in self.signals], dtype=np.float64
+        )
+        
+        # Leveraged % move from entry to each TP (same formula as dashboard.js),
+        # zeroed for TPs above the highest one hit, TPs without a price, and
+        # signals without an entry price
+        hit = (
+            (np.arange(6) < highest_tp[:, None])
+            & (tps != 0)
+            & (entry != 0)[:, None]
+        )
+        safe_entry = np.where(entry == 0, 1.0, entry)[:, None]
+        moves = np.abs(tps - safe_entry) / safe_entry * 100.0 * 500.0
+        
+        # Profit % each TP level contributes per unit of position closed there,
+        # so a signal's profit under a strategy is contributions @ strategy.
+        # A stop loss loses the full risk percentage whatever the strategy.
+        self._contributions = np.where(hit, moves, 0.0) * (risk / 100.0)[:, None]
+        self._sl_profits = np.where(highest_tp == 0, -risk, 0.0)
         
     def calculate_signal_profit(self, signal: Dict, strategy: List[float]) -> float:
         """
@@ -92,9 +151,9 @@ class StrategyOptimizer:
         
         total_profit = 0.0
         
-        for i in range(highest_tp):
-            tp_num = i + 1
-            tp_price = signal.get(f'tp{tp_num}')
+        tps = signal['_tps']
+        for i in range(min(highest_tp, 6)):
+            tp_price = tps[i]
             
             if not tp_price:
                 continue
@@ -122,27 +181,24 @@ class StrategyOptimizer:
         Returns:
             Tuple of (total_pl_percent, stats_dict)
         """
-        total_pl = 0.0
-        wins = 0
-        losses = 0
+        return self._profit_cache(tuple(float(x) for x in strategy))
+    
+    def _score_strategy(self, strategy: Tuple[float, ...]) -> Tuple[float, Dict]:
+        profits = self._contributions @ np.asarray(strategy, dtype=np.float64) + self._sl_profits
         
-        signal_results = []
+        total_pl = float(profits.sum())
+        wins = int((profits > 0).sum())
+        losses = int((profits < 0).sum())
         
-        for signal in self.signals:
-            profit = self.calculate_signal_profit(signal, strategy)
-            total_pl += profit
-            
-            if profit > 0:
-                wins += 1
-            elif profit < 0:
-                losses += 1
-            
-            signal_results.append({
+        signal_results = [
+            {
                 'signal_number': signal['signal_number'],
                 'symbol': signal['symbol'],
                 'highest_tp': signal['highest_tp'],
                 'profit': profit
-            })
+            }
+            for signal, profit in zip(self.signals, profits.tolist())
+        ]
         
         win_rate = (wins / len(self.signals) * 100) if self.signals else 0
         
@@ -156,7 +212,7 @@ class StrategyOptimizer:
         
         return total_pl, stats
     
-    def generate_strategies(self, step: int = 5, include_tp6: bool = False) -> List[List[float]]:
+    def generate_strategies(self, step: int = 5, include_tp6: bool = False) -> np.ndarray:
         """
         Generate all possible strategies that sum to 100%.
         
@@ -165,43 +221,32 @@ class StrategyOptimizer:
             include_tp6: Whether to include TP6 in strategies
             
         Returns:
-            List of strategy combinations (each is a list of 6 floats)
+            Array of strategy combinations, shape (n, 6), each row being the
+            partial exit fraction for TP1-TP6
         """
         strategies = []
         
-        # Create range of possible percentages (as integers for simplicity)
-        percentages = list(range(0, 101, step))
-        
         print(f"Generating strategies with step size {step}%...")
         
-        if not include_tp6:
-            # Only use TP1-TP5, TP6 is always 0
-            for tp1 in percentages:
-                for tp2 in percentages:
-                    for tp3 in percentages:
-                        for tp4 in percentages:
-                            for tp5 in percentages:
-                                if tp1 + tp2 + tp3 + tp4 + tp5 == 100:
-                                    strategies.append([
-                                        tp1/100, tp2/100, tp3/100, 
-                                        tp4/100, tp5/100, 0.0
-                                    ])
-        else:
-            # Use all 6 TPs
-            for tp1 in percentages:
-                for tp2 in percentages:
-                    for tp3 in percentages:
-                        for tp4 in percentages:
-                            for tp5 in percentages:
-                                for tp6 in percentages:
-                                    if tp1 + tp2 + tp3 + tp4 + tp5 + tp6 == 100:
-                                        strategies.append([
-                                            tp1/100, tp2/100, tp3/100, 
-                                            tp4/100, tp5/100, tp6/100
-                                        ])
+        # Only use TP1-TP5 unless TP6 is included (TP6 is then always 0)
+        levels = 6 if include_tp6 else 5
+        
+        # Stars and bars: every way of splitting 100 // step units across the
+        # TP levels is one choice of levels - 1 divider positions among
+        # units + levels - 1 slots, so only valid strategies are enumerated.
+        # Steps that don't divide 100 can't produce a strategy summing to 100%.
+        if 100 % step == 0:
+            units = 100 // step
+            slots = units + levels - 1
+            for dividers in itertools.combinations(range(slots), levels - 1):
+                bounds = (-1,) + dividers + (slots,)
+                strategies.append(
+                    [(bounds[i + 1] - bounds[i] - 1) * step / 100 for i in range(levels)]
+                    + [0.0] * (6 - levels)
+                )
         
         print(f"Generated {len(strategies)} unique strategies")
-        return strategies
+        return np.asarray(strategies, dtype=np.float64).reshape(-1, 6)
     
     def optimize(self, step: int = 5, include_tp6: bool = False, top_n: int = 10):
         """
@@ -211,6 +256,9 @@ class StrategyOptimizer:
             step: Percentage step size for testing
             include_tp6: Whether to include TP6 in optimization
             top_n: Number of top strategies to display
+            
+        Returns:
+            The top_n results by total P/L, each with full stats
         """
         print("="*80)
         print("GH TRADES Partial Exit Strategy Optimizer")
@@ -254,25 +302,39 @@ class StrategyOptimizer:
         strategies = self.generate_strategies(step=step, include_tp6=include_tp6)
         
         print(f"Testing {len(strategies)} strategies...")
-        print("This may take a few minutes...\n")
         
-        results = []
+        # Every strategy's total P/L in one product: a signal's profit is
+        # linear in the strategy, so the portfolio total is too
+        totals = strategies @ self._contributions.sum(axis=0) + self._sl_profits.sum()
+        
+        # Contributions are never negative and stop-outs don't depend on the
+        # strategy, so a signal wins exactly when the strategy closes part of
+        # the position at a TP it reached. Strategies exiting at the same TP
+        # levels therefore win the same signals, and only one per set of
+        # levels needs the per-signal scan.
+        exit_levels = (strategies > 0) @ (1 << np.arange(6))
+        _, first, level_set = np.unique(exit_levels, return_index=True, return_inverse=True)
+        _, set_wins, _ = score_strategies(self._contributions, self._sl_profits, strategies[first])
+        wins = set_wins[level_set.ravel()]
+        
+        # Top strategies by total P/L (ties keep generation order). The best
+        # one is always scored, since it is the recommendation even when
+        # top_n is 0
+        top_n = max(0, min(top_n, len(strategies)))
+        ranked = max(top_n, 1)
+        top = np.argpartition(-totals, ranked - 1)[:ranked]
+        top = top[np.lexsort((top, -totals[top]))]
         
-        for i, strategy in enumerate(strategies):
-            if (i + 1) % 1000 == 0:
-                print(f"  Progress: {i+1}/{len(strategies)} strategies tested...")
-            
+        results = []
+        for idx in top:
+            strategy = strategies[idx]
             total_pl, stats = self.calculate_portfolio_profit(strategy)
-            
             results.append({
                 'strategy': strategy,
                 'total_pl': total_pl,
                 'stats': stats
             })
         
-        # Sort by total P/L (descending)
-        results.sort(key=lambda x: x['total_pl'], reverse=True)
-        
         print(f"\nOptimization complete!")
         print(f"\n{'='*80}")
         print(f"TOP {top_n} STRATEGIES (by Total P/L %)")
@@ -298,21 +360,23 @@ class StrategyOptimizer:
                   f"TP5={int(strategy[4]*100)}%, TP6={int(strategy[5]*100)}%")
             print()
         
-        # Find best strategy by win rate
-        best_winrate = max(results, key=lambda x: x['stats']['win_rate'])
+        # Find best strategy by win rate (highest P/L among the best win rates)
+        best_wins = np.flatnonzero(wins == wins.max())
+        best_idx = best_wins[np.argmax(totals[best_wins])]
+        best_winrate_pl, best_winrate_stats = self.calculate_portfolio_profit(strategies[best_idx])
         
         print(f"{'='*80}")
         print(f"BEST STRATEGY BY WIN RATE")
         print(f"{'='*80}\n")
         
-        strategy = best_winrate['strategy']
+        strategy = strategies[best_idx]
         strategy_str = "-".join([f"{int(s*100)}" for s in strategy[:5]])
         if strategy[5] > 0:
             strategy_str += f"-{int(strategy[5]*100)}"
         
         print(f"Strategy: {strategy_str}")
-        print(f"Win Rate: {best_winrate['stats']['win_rate']:.1f}%")
-        print(f"Total P/L: {best_winrate['total_pl']:+.2f}%")
+        print(f"Win Rate: {best_winrate_stats['win_rate']:.1f}%")
+        print(f"Total P/L: {best_winrate_pl:+.2f}%")
         print()
         
         # Export best strategy
@@ -333,7 +397,7 @@ class StrategyOptimizer:
         print(f"Improvement over baseline: {((best_strategy['total_pl'] - baseline_pl) / abs(baseline_pl) * 100):+.1f}%")
         print()
         
-        return results
+        return results[:top_n]
 
 
 if __name__ == "__main__":
@@ -9,87 +9,282 @@ This script creates the necessary tables for:
 
 import sqlite3
 import os
-from datetime import datetime
-
-def create_user_tables(db_path="telegram_messages.db"):
-    """Create user management tables"""
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Users table - stores Discord user information
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            discord_id TEXT UNIQUE NOT NULL,
-            discord_username TEXT NOT NULL,
-            discord_avatar TEXT,
-            email TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP,
-            is_active BOOLEAN DEFAULT 1
-        )
-    ''')
-    
-    # MT5 Accounts table - links MT5 accounts to users
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS mt5_accounts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            account_number TEXT NOT NULL,
-            account_name TEXT,
-            broker TEXT,
-            server TEXT,
-            is_primary BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_sync TIMESTAMP,
-            is_active BOOLEAN DEFAULT 1,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-            UNIQUE(user_id, account_number)
-        )
-    ''')
-    
-    # User Strategies table - stores custom partial exit strategies per user
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_strategies (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            strategy_name TEXT NOT NULL,
-            tp1_percent INTEGER NOT NULL DEFAULT 50,
-            tp2_percent INTEGER NOT NULL DEFAULT 20,
-            tp3_percent INTEGER NOT NULL DEFAULT 10,
-            tp4_percent INTEGER NOT NULL DEFAULT 10,
-            tp5_percent INTEGER NOT NULL DEFAULT 10,
-            tp6_percent INTEGER NOT NULL DEFAULT 0,
-            is_active BOOLEAN DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-            CHECK (tp1_percent + tp2_percent + tp3_percent + tp4_percent + tp5_percent + tp6_percent = 100)
-        )
-    ''')
-    
-    # Sessions table - for managing user sessions
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            session_token TEXT UNIQUE NOT NULL,
-            expires_at TIMESTAMP NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    ''')
+import shutil
+import threading
+
+from sqlite_connections import ConnectionPool, configure_connection
+
+# Empty, fully indexed copy of the user schema shipped with the app, so a
+# fresh deploy copies one file instead of building every table and index
+TEMPLATE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.db')
+
+# Page size for user databases, larger than SQLite's 4096 default so each
+# B-tree read brings in more rows
+PAGE_SIZE = 8192
+
+# Applied to every connection this script opens, ahead of the shared
+# CONNECTION_PRAGMAS. page_size and auto_vacuum only take effect on a new,
+# empty database (and must come before WAL), so create_user_tables converts
+# existing ones with enable_incremental_vacuum; journal_mode=WAL is stored in
+# the database file, so the dashboard's later connections inherit it;
+# foreign_keys is what makes the ON DELETE CASCADE clauses take effect.
+SETUP_PRAGMAS = (
+    f'PRAGMA page_size={PAGE_SIZE}',
+    'PRAGMA auto_vacuum=INCREMENTAL',
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA foreign_keys=ON',
+)
+
+
+# Free pages maintenance() hands back per run, so churn in sessions doesn't
+# leave the file full of holes without a blocking full VACUUM
+INCREMENTAL_VACUUM_PAGES = 1000
+
+# User management schema, run as a single script by create_user_tables.
+# Timestamps are INTEGER unix epoch seconds.
+# Ids are plain INTEGER PRIMARY KEY rowid aliases: AUTOINCREMENT's
+# never-reuse guarantee isn't needed and costs a sqlite_sequence update per
+# insert. Tables created by older versions are rebuilt to match by
+# migrate_user_tables.
+SCHEMA_SQL = '''
+    -- Users table - stores Discord user information
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        discord_id INTEGER UNIQUE NOT NULL,  -- snowflake, fits in 64 bits
+        discord_username TEXT NOT NULL,
+        discord_avatar TEXT,
+        email TEXT,
+        created_at INTEGER NOT NULL DEFAULT (unixepoch()),
+        last_login INTEGER,
+        is_active BOOLEAN DEFAULT 1
+    );
+    
+    -- MT5 Accounts table - links MT5 accounts to users
+    CREATE TABLE IF NOT EXISTS mt5_accounts (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        account_number INTEGER NOT NULL,
+        account_name TEXT,
+        broker TEXT,
+        server TEXT,
+        is_primary BOOLEAN DEFAULT 0,
+        created_at INTEGER NOT NULL DEFAULT (unixepoch()),
+        last_sync INTEGER,
+        is_active BOOLEAN DEFAULT 1,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        UNIQUE(user_id, account_number)
+    );
+    
+    -- User Strategies table - stores custom partial exit strategies per user
+    CREATE TABLE IF NOT EXISTS user_strategies (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        strategy_name TEXT NOT NULL,
+        tp1_percent INTEGER NOT NULL DEFAULT 50,
+        tp2_percent INTEGER NOT NULL DEFAULT 20,
+        tp3_percent INTEGER NOT NULL DEFAULT 10,
+        tp4_percent INTEGER NOT NULL DEFAULT 10,
+        tp5_percent INTEGER NOT NULL DEFAULT 10,
+        tp6_percent INTEGER NOT NULL DEFAULT 0,
+        is_active BOOLEAN DEFAULT 1,
+        created_at INTEGER NOT NULL DEFAULT (unixepoch()),
+        updated_at INTEGER NOT NULL DEFAULT (unixepoch()),
+        tp_total INTEGER GENERATED ALWAYS AS (
+            tp1_percent + tp2_percent + tp3_percent + tp4_percent + tp5_percent + tp6_percent
+        ) STORED,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        CHECK (tp_total = 100)
+    );
+    
+    -- Sessions table - for managing user sessions. Clustered on the token
+    -- every request looks up, so a lookup is one B-tree descent. Kept in
+    -- the main database: a foreign key can't reach users from an attached
+    -- one, and with WAL + synchronous=NORMAL a login doesn't fsync anyway
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_token TEXT PRIMARY KEY NOT NULL,
+        user_id INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL,
+        created_at INTEGER NOT NULL DEFAULT (unixepoch()),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    
+    -- Indexes for performance
+    CREATE INDEX IF NOT EXISTS idx_users_discord_id ON users(discord_id);
+    CREATE INDEX IF NOT EXISTS idx_mt5_accounts_account_number ON mt5_accounts(account_number);
+    CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id);
+    CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at);
+    
+    -- Per-user lookups cover active rows only; queries must spell
+    -- is_active = 1 for the planner to use them. Lookups over all of a
+    -- user's MT5 accounts use the UNIQUE(user_id, account_number) index.
+    CREATE INDEX IF NOT EXISTS idx_mt5_accounts_active_user ON mt5_accounts(user_id) WHERE is_active = 1;
+    CREATE INDEX IF NOT EXISTS idx_user_strategies_active_user ON user_strategies(user_id) WHERE is_active = 1;
+    
+    -- Full per-user indexes replaced by the partial ones above
+    DROP INDEX IF EXISTS idx_mt5_accounts_user_id;
+    DROP INDEX IF EXISTS idx_mt5_accounts_user_primary;
+    DROP INDEX IF EXISTS idx_user_strategies_user_active;
+'''
+
+
+# Declared type changes migrate_user_tables converts when rebuilding a
+# table, keyed by (old type, new type); other columns are copied as they are
+COLUMN_CONVERSIONS = {
+    ('TEXT', 'INTEGER'): 'CAST({column} AS INTEGER)',
+    # 'YYYY-MM-DD HH:MM:SS' text from CURRENT_TIMESTAMP to epoch seconds
+    ('TIMESTAMP', 'INTEGER'): 'unixepoch({column})',
+}
+
+
+# Seed statements for add_sample_data. Users and MT5 accounts are upserted
+# so reruns keep the existing rows (and ids).
+USERS_UPSERT_SQL = '''
+    INSERT INTO users (discord_id, discord_username, discord_avatar, email)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(discord_id) DO UPDATE SET discord_username = excluded.discord_username
+'''
+MT5_ACCOUNTS_UPSERT_SQL = '''
+    INSERT INTO mt5_accounts (user_id, account_number, account_name, broker, server, is_primary)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, account_number) DO UPDATE SET account_name = excluded.account_name
+'''
+USER_STRATEGIES_INSERT_SQL = '''
+    INSERT OR IGNORE INTO user_strategies (
+        user_id, strategy_name,
+        tp1_percent, tp2_percent, tp3_percent, tp4_percent, tp5_percent, tp6_percent,
+        is_active
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Sample rows for add_sample_data. MT5 accounts and strategies name their
+# owner by Discord id, resolved to the user id after the users are seeded.
+USERS_SEED = [
+    # (discord_id, discord_username, discord_avatar, email)
+    (123456789, 'TestUser', None, 'test@example.com'),
+]
+MT5_SEED = [
+    # (discord_id, account_number, account_name, broker, server, is_primary)
+    (123456789, 11060034, 'Demo Account', 'Exness', 'ExnessDemo-MT5', 1),
+]
+STRATEGY_SEED = [
+    # (discord_id, strategy_name, tp1..tp6 percent, is_active)
+    (123456789, 'Default Strategy', 50, 20, 10, 10, 10, 0, 1),
+]
+
+
+def _configure_connection(conn):
+    """Apply SETUP_PRAGMAS and the shared connection pragmas to a newly opened connection"""
+    return configure_connection(conn, SETUP_PRAGMAS)
+
+
+# One ConnectionPool per database path, so each thread keeps one configured
+# connection per database open and its page cache stays warm between calls
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection(db_path="telegram_messages.db"):
+    """Get this thread's pooled connection to db_path, opening it on first use"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path, pragmas=SETUP_PRAGMAS)
+    return pool.get()
+
+
+def migrate_user_tables(conn):
+    """Rebuild any user table whose columns differ from SCHEMA_SQL (e.g. TEXT
+    Discord ids from older versions), keeping its rows"""
+    # The tables as SCHEMA_SQL would create them today
+    reference = sqlite3.connect(':memory:')
+    reference.executescript(SCHEMA_SQL)
+    outdated = []
+    for table, sql in reference.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'").fetchall():
+        current = [row[1:] for row in conn.execute(f'PRAGMA table_xinfo({table})')]
+        target = [row[1:] for row in reference.execute(f'PRAGMA table_xinfo({table})')]
+        if current and current != target:
+            outdated.append((table, sql, current, target))
+    reference.close()
+    if not outdated:
+        return
+    
+    # SQLite's table rebuild procedure: foreign keys off (only possible
+    # outside a transaction) so dropping the old tables leaves referencing
+    # rows alone, then checked before the rebuild commits
+    conn.execute('PRAGMA foreign_keys=OFF')
+    try:
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for table, sql, current, target in outdated:
+                old_types = {name: type_.upper() for name, type_, *_ in current}
+                columns, values = [], []
+                for name, type_, notnull, default, _, hidden in target:
+                    # Generated columns are computed, new columns get their default
+                    if hidden or name not in old_types:
+                        continue
+                    conversion = COLUMN_CONVERSIONS.get((old_types[name], type_.upper()), '{column}')
+                    value = conversion.format(column=name)
+                    if notnull and default is not None:
+                        value = f'COALESCE({value}, {default})'
+                    columns.append(name)
+                    values.append(value)
+                
+                conn.execute(sql.replace(f'CREATE TABLE {table}', f'CREATE TABLE {table}_migrated', 1))
+                conn.execute(
+                    f"INSERT INTO {table}_migrated ({', '.join(columns)}) "
+                    f"SELECT {', '.join(values)} FROM {table}"
+                )
+                conn.execute(f'DROP TABLE {table}')
+                conn.execute(f'ALTER TABLE {table}_migrated RENAME TO {table}')
+            
+            violations = conn.execute('PRAGMA foreign_key_check').fetchall()
+            if violations:
+                raise sqlite3.IntegrityError(f"Foreign key violations after migration: {violations}")
+    finally:
+        conn.execute('PRAGMA foreign_keys=ON')
+    
+    print(f"✅ Migrated tables: {', '.join(table for table, *_ in outdated)}")
+
+
+def enable_incremental_vacuum(conn):
+    """Switch a database created before SETUP_PRAGMAS to PAGE_SIZE pages and
+    incremental auto-vacuum with a one-time VACUUM (a no-op once switched)"""
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    if page_size == PAGE_SIZE and auto_vacuum == 2:  # 2 = INCREMENTAL
+        return
+    
+    # VACUUM can't change the page size of a WAL database, so leave WAL for
+    # the rebuild. While other connections are open the switch is refused
+    # and only auto_vacuum changes; the page size follows on a later run.
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.execute(f'PRAGMA page_size={PAGE_SIZE}')
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    conn.execute('VACUUM')
+    conn.execute('PRAGMA journal_mode=WAL')
+    print("✅ Database rebuilt for incremental auto-vacuum")
+
+
+def create_user_tables(db_path="telegram_messages.db", conn=None):
+    """Create user management tables (on conn, or the pooled connection to db_path)"""
+    if conn is None:
+        conn = get_connection(db_path)
     
-    # Create indexes for performance
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_discord_id ON users(discord_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_mt5_accounts_user_id ON mt5_accounts(user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_mt5_accounts_account_number ON mt5_accounts(account_number)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_token ON sessions(session_token)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id)')
+    # Existing tables first, so the indexes below are built on the new ones
+    migrate_user_tables(conn)
     
-    conn.commit()
-    conn.close()
+    # executescript runs in autocommit mode, so the script brings its own
+    # BEGIN/COMMIT to keep the whole schema one transaction; the with block
+    # rolls it back if a statement fails, leaving the pooled connection usable
+    with conn:
+        conn.executescript('BEGIN IMMEDIATE;' + SCHEMA_SQL + 'COMMIT;')
+    
+    # page_size and auto_vacuum only apply to new files; existing ones are
+    # rebuilt once so maintenance()'s incremental_vacuum has pages to free
+    enable_incremental_vacuum(conn)
+    
+    # Refresh planner statistics for any tables that need them
+    conn.execute('PRAGMA optimize')
     
     print("✅ User management tables created successfully!")
     print("\nTables created:")
@@ -99,36 +294,99 @@ def create_user_tables(db_path="telegram_messages.db"):
     print("  - sessions: User session management")
 
 
-def add_sample_data(db_path="telegram_messages.db"):
+def build_template(template_path=TEMPLATE_DB):
+    """Write the empty user schema to template_path (rerun after changing SCHEMA_SQL)"""
+    conn = _configure_connection(sqlite3.connect(template_path, isolation_level=None))
+    try:
+        create_user_tables(conn=conn)
+    finally:
+        # Closing checkpoints the WAL, so the template is a single file
+        conn.close()
+
+
+def bootstrap_database(db_path="telegram_messages.db"):
+    """Create db_path from the template if it doesn't exist, then bring its schema up to date"""
+    try:
+        # 'xb' only creates a file that isn't there yet, so there's no
+        # window between checking for the database and creating it
+        with open(TEMPLATE_DB, 'rb') as template, open(db_path, 'xb') as target:
+            shutil.copyfileobj(template, target)
+    except (FileExistsError, FileNotFoundError):
+        # Existing database, or no template shipped: build with DDL below
+        pass
+    
+    # Idempotent: on a copied template every statement is already satisfied
+    # and nothing is written
+    create_user_tables(db_path)
+
+
+def create_signal_indexes(db_path="telegram_messages.db"):
+    """Index the bot's signal tables for the dashboard's signal history queries"""
+    conn = get_connection(db_path)
+    
+    # The bot creates signal_details; nothing to index until it has run
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'signal_details'")
+    if exists.fetchone() is None:
+        print("⚠️  signal_details not found, skipping signal indexes")
+        return
+    
+    # Symbol-filtered history pages seek straight to the symbol's signals.
+    # announced_tps needs nothing extra: its (signal_number, tp_level)
+    # primary key already covers the TP lookups, in tp_level order.
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_signal_details_symbol_created_at ON signal_details(symbol, created_at)')
+    
+    # Give the query planner statistics for the new index
+    conn.execute('ANALYZE')
+    
+    print("✅ Signal indexes created successfully!")
+
+
+def maintenance(db_path="telegram_messages.db"):
+    """Return free pages to the filesystem and re-gather planner statistics (run periodically)"""
+    conn = get_connection(db_path)
+    # incremental_vacuum frees one page per step and execute() only steps
+    # once, so it goes through executescript, which runs it to completion
+    conn.executescript(f'PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});')
+    conn.execute('ANALYZE')
+
+
+def add_sample_data(db_path="telegram_messages.db", conn=None):
     """Add sample data for testing (optional)"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Add a test user
-    cursor.execute('''
-        INSERT OR IGNORE INTO users (discord_id, discord_username, discord_avatar, email)
-        VALUES (?, ?, ?, ?)
-    ''', ('123456789', 'TestUser', None, 'test@example.com'))
-    
-    user_id = cursor.lastrowid or cursor.execute('SELECT id FROM users WHERE discord_id = ?', ('123456789',)).fetchone()[0]
-    
-    # Add test MT5 account
-    cursor.execute('''
-        INSERT OR IGNORE INTO mt5_accounts (user_id, account_number, account_name, broker, server, is_primary)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (user_id, '11060034', 'Demo Account', 'Exness', 'ExnessDemo-MT5', 1))
-    
-    # Add default strategy
-    cursor.execute('''
-        INSERT OR IGNORE INTO user_strategies (
-            user_id, strategy_name, 
-            tp1_percent, tp2_percent, tp3_percent, tp4_percent, tp5_percent, tp6_percent,
-            is_active
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (user_id, 'Default Strategy', 50, 20, 10, 10, 10, 0, 1))
-    
-    conn.commit()
-    conn.close()
+    if conn is None:
+        conn = get_connection(db_path)
+    
+    # Seed ids are integers, so the tables must be past the TEXT id schema
+    migrate_user_tables(conn)
+    
+    # All sample rows go in one transaction, committed when the with block
+    # ends or rolled back if an insert fails
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        # Check foreign keys once at commit instead of per inserted row
+        conn.execute('PRAGMA defer_foreign_keys=ON')
+        
+        # Test users
+        conn.executemany(USERS_UPSERT_SQL, USERS_SEED)
+        
+        # Map the seeded Discord ids back to user ids in one query
+        discord_ids = [user[0] for user in USERS_SEED]
+        user_ids = dict(conn.execute(
+            f"SELECT discord_id, id FROM users "
+            f"WHERE discord_id IN ({','.join('?' * len(discord_ids))})",
+            discord_ids
+        ))
+        
+        # Test MT5 accounts
+        conn.executemany(
+            MT5_ACCOUNTS_UPSERT_SQL,
+            [(user_ids[account[0]],) + account[1:] for account in MT5_SEED]
+        )
+        
+        # Default strategies
+        conn.executemany(
+            USER_STRATEGIES_INSERT_SQL,
+            [(user_ids[strategy[0]],) + strategy[1:] for strategy in STRATEGY_SEED]
+        )
     
     print("\n✅ Sample data added for testing!")
 
@@ -139,14 +397,13 @@ if __name__ == "__main__":
     print("="*70)
     print()
     
-    # Check if database exists
+    # New databases start as a copy of the template; sqlite3 creates the
+    # file itself if no template is shipped
     db_path = "telegram_messages.db"
-    if not os.path.exists(db_path):
-        print(f"⚠️  Database not found at {db_path}")
-        print("Creating new database...")
     
     # Create tables
-    create_user_tables(db_path)
+    bootstrap_database(db_path)
+    create_signal_indexes(db_path)
     
     # Ask if user wants sample data
     print("\n" + "="*70)
@@ -0,0 +1,74 @@
+"""
+SQLite connection settings and pooling shared by the dashboard and the setup script
+
+Every long-lived connection either of them opens is tuned the same way and
+kept in a ConnectionPool, so the definitions live here once instead of
+being copied into each module.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, Iterable, List, Optional
+
+# Applied to every pooled connection. journal_mode=WAL is persistent on the
+# database file, so it is only switched once when the schema is created.
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-65536',
+    'PRAGMA busy_timeout=5000',
+)
+
+# Prepared statements kept per pooled connection, so repeated queries skip
+# SQLite's parse and plan step
+STATEMENT_CACHE_SIZE = 256
+
+
+def configure_connection(conn: sqlite3.Connection, pragmas: Iterable[str] = ()) -> sqlite3.Connection:
+    """Apply pragmas, then CONNECTION_PRAGMAS, to a newly opened connection"""
+    for pragma in (*pragmas, *CONNECTION_PRAGMAS):
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """One long-lived connection to a database per thread, opened and
+    configured on first use, so SQLite's page cache stays warm between calls"""
+    
+    def __init__(self, database: str, pragmas: Iterable[str] = (),
+                 row_factory: Optional[Callable] = None, uri: bool = False):
+        self.database = database
+        self.pragmas = tuple(pragmas)
+        self.row_factory = row_factory
+        self.uri = uri
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+    
+    def get(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.database,
+                uri=self.uri,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            configure_connection(conn, self.pragmas)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def detach_all(self) -> List[sqlite3.Connection]:
+        """Remove every thread's connection from the pool and return them for
+        the caller to close; the next get() on any thread opens a new one"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        return connections
@@ -0,0 +1,74 @@
+"""
+Strategy scoring kernel for the partial exit optimizer
+
+Scores a grid of strategies against every signal, returning each strategy's
+total P/L % plus its win and loss counts. Uses a Numba JIT kernel that runs
+strategies in parallel across cores when numba is installed, and blocked
+NumPy matrix products otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Max (strategies x signals) profit matrix entries scored at once by the
+# NumPy path
+SCORE_BLOCK_SIZE = 4_000_000
+
+
+def _score_numpy(contributions, sl_profits, strategies, out_totals, out_wins, out_losses):
+    block = max(1, SCORE_BLOCK_SIZE // max(1, len(sl_profits)))
+    for start in range(0, len(strategies), block):
+        profits = strategies[start:start + block] @ contributions.T + sl_profits
+        out_totals[start:start + block] = profits.sum(axis=1)
+        out_wins[start:start + block] = (profits > 0).sum(axis=1)
+        out_losses[start:start + block] = (profits < 0).sum(axis=1)
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _score_numba(contributions, sl_profits, strategies, out_totals, out_wins, out_losses):
+        n_signals, n_levels = contributions.shape
+        for s in prange(strategies.shape[0]):
+            total = 0.0
+            wins = 0
+            losses = 0
+            for i in range(n_signals):
+                profit = sl_profits[i]
+                for k in range(n_levels):
+                    profit += contributions[i, k] * strategies[s, k]
+                total += profit
+                if profit > 0:
+                    wins += 1
+                elif profit < 0:
+                    losses += 1
+            out_totals[s] = total
+            out_wins[s] = wins
+            out_losses[s] = losses
+
+
+def score_strategies(contributions: np.ndarray, sl_profits: np.ndarray, strategies: np.ndarray):
+    """
+    Score every strategy against every signal.
+    
+    Args:
+        contributions: (signals, 6) profit % per unit of position closed at each TP
+        sl_profits: (signals,) fixed profit % per signal (the loss for stop-outs, else 0)
+        strategies: (strategies, 6) partial exit fractions for TP1-TP6
+        
+    Returns:
+        Tuple of (totals, wins, losses) arrays, one entry per strategy
+    """
+    contributions = np.ascontiguousarray(contributions)
+    strategies = np.ascontiguousarray(strategies, dtype=contributions.dtype)
+    totals = np.empty(len(strategies), dtype=contributions.dtype)
+    wins = np.empty(len(strategies), dtype=np.int64)
+    losses = np.empty(len(strategies), dtype=np.int64)
+    
+    score = _score_numba if HAS_NUMBA else _score_numpy
+    score(contributions, sl_profits, strategies, totals, wins, losses)
+    return totals, wins, losses
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# dashboard_backend opens its database relative to the working directory as
+# soon as it is imported, so keep that out of the checkout
+os.chdir(tempfile.mkdtemp())
@@ -0,0 +1,272 @@
+import random
+import orjson
+import pytest
+
+import dashboard_backend
+from dashboard_backend import DashboardDatabase
+
+
+def make_trade(trade_id, **overrides):
+    trade = {
+        'trade_id': trade_id,
+        'account_id': 'acct-1',
+        'symbol': 'EURUSD',
+        'action': 'BUY',
+        'entry_price': 1.1,
+        'lots': 0.1,
+        'profit': 12.5,
+    }
+    trade.update(overrides)
+    return trade
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = DashboardDatabase(str(tmp_path / 'dashboard.db'))
+    yield database
+    database.close()
+
+
+def stored_trade_ids(database):
+    return {row[0] for row in database._get_conn().execute('SELECT trade_id FROM trades')}
+
+
+def test_record_trade_rejects_unbindable_values(database):
+    with pytest.raises(ValueError, match='profit'):
+        database.record_trade(make_trade('bad', profit={'amount': 1}))
+    with pytest.raises(ValueError, match='signal_number'):
+        database.record_trade(make_trade('huge', signal_number=2 ** 64))
+    database.flush_trades()
+    assert stored_trade_ids(database) == set()
+
+
+def test_bad_trade_in_batch_keeps_good_trades(database, monkeypatch, caplog):
+    good_ids = [f'good-{i}' for i in range(5)]
+    # Hold the batch open until all six rows have arrived, so the bad row
+    # is guaranteed to share it with the good ones
+    monkeypatch.setattr(dashboard_backend, 'TRADE_BATCH_SIZE', len(good_ids) + 1)
+    monkeypatch.setattr(dashboard_backend, 'TRADE_FLUSH_INTERVAL', 10)
+    for trade_id in good_ids[:3]:
+        database.record_trade(make_trade(trade_id))
+    # A row that slipped past validation fails the batch's executemany
+    bad_row = ('bad', 'acct-1', None, 'EURUSD', 'BUY', None, None, 1.1, None, 0.1,
+               {'amount': 1}, 0, 0, None, None)
+    database._trade_queue.put(bad_row)
+    for trade_id in good_ids[3:]:
+        database.record_trade(make_trade(trade_id))
+    with caplog.at_level('WARNING', logger=dashboard_backend.logger.name):
+        database.flush_trades()
+    
+    assert stored_trade_ids(database) == set(good_ids)
+    assert 'Error writing 6 trades as a batch' in caplog.text
+    errors = [r.getMessage() for r in caplog.records if r.levelname == 'ERROR']
+    assert len(errors) == 1
+    assert errors[0].startswith("Error writing trade 'bad'")
+
+
+def test_post_trade_with_bad_value_returns_400():
+    client = dashboard_backend.dashboard_app.test_client()
+    response = client.post('/api/trades', json=make_trade('bad-post', profit={'amount': 1}))
+    assert response.status_code == 400
+    
+    response = client.post('/api/trades', json=make_trade('good-post'))
+    assert response.status_code == 200
+    dashboard_backend.db.flush_trades()
+    assert 'good-post' in stored_trade_ids(dashboard_backend.db)
+    assert 'bad-post' not in stored_trade_ids(dashboard_backend.db)
+
+
+def test_trader_stats_payload_excludes_internal_columns(database):
+    database.update_trader_stats('acct-1', {'total_trades': 3})
+    stats = database.get_trader_stats('acct-1')
+    assert 'anon_name' not in stats
+    assert set(stats) == set(dashboard_backend.TRADER_STATS_COLUMNS)
+    assert stats['total_trades'] == 3
+
+
+def test_trades_json_keeps_real_values():
+    # Decimals as MT5 reports them, and results of float arithmetic that
+    # need 16-17 significant digits to round-trip
+    values = [1.23456, 0.01, 123456789.12, -98765.4321, 1e-05, 12345678901234.5,
+              0.1 + 0.2, 1 / 3, 2 ** 0.5 * 1e6]
+    for i, value in enumerate(values):
+        dashboard_backend.db.record_trade(
+            make_trade(f'real-{i}', account_id='acct-real', entry_price=value, profit=value)
+        )
+    dashboard_backend.db.flush_trades()
+    
+    client = dashboard_backend.dashboard_app.test_client()
+    payload = orjson.loads(client.get('/api/trades/acct-real').data)
+    trades = {trade['trade_id']: trade for trade in payload['data']}
+    assert payload['count'] == len(values)
+    for i, value in enumerate(values):
+        assert trades[f'real-{i}']['entry_price'] == value
+        assert trades[f'real-{i}']['profit'] == value
+
+
+def test_backtests_with_legacy_nan_json():
+    with dashboard_backend.db._transaction() as conn:
+        conn.execute('''
+            INSERT INTO backtest_results (
+                backtest_id, account_id, strategy_name, start_date, end_date,
+                initial_balance, final_balance, total_trades, winning_trades,
+                win_rate, profit_factor, max_drawdown, sharpe_ratio,
+                parameters, equity_curve
+            ) VALUES ('legacy-nan', 'acct-legacy', 'legacy', '2024-01-01', '2024-02-01',
+                      1000, 1100, 10, 6, 60.0, 1.5, 0.1, 1.2, ?, ?)
+        ''', ('{"risk": NaN, "lots": 0.1}', '[1000.0, Infinity, 1100.0]'))
+    
+    client = dashboard_backend.dashboard_app.test_client()
+    response = client.get('/api/backtests?account_id=acct-legacy')
+    assert response.status_code == 200
+    payload = orjson.loads(response.data)
+    assert payload['count'] == 1
+    backtest = payload['data'][0]
+    assert backtest['parameters'] == {'risk': None, 'lots': 0.1}
+    assert backtest['equity_curve'] == [1000.0, None, 1100.0]
+
+
+def test_save_backtest_accepts_non_str_keys(database):
+    database.save_backtest({
+        'backtest_id': 'int-keys', 'account_id': 'acct-1', 'strategy_name': 'tp-split',
+        'start_date': '2024-01-01', 'end_date': '2024-02-01',
+        'initial_balance': 1000, 'final_balance': 1100, 'total_trades': 10,
+        'winning_trades': 6, 'win_rate': 60.0, 'profit_factor': 1.5,
+        'max_drawdown': 0.1, 'sharpe_ratio': 1.2,
+        'parameters': {1: 50, 2: 30, 3: 20},
+        'equity_curve': [1000.0, 1100.0],
+    })
+    [backtest] = database.get_backtests('acct-1')
+    assert backtest['parameters'] == {'1': 50, '2': 30, '3': 20}
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+def test_signal_history_serves_stale_body_on_upstream_error(monkeypatch, caplog):
+    responses = iter([
+        FakeResponse(200, b'{"signals":[1]}', {'ETag': '"v1"'}),
+        FakeResponse(503),
+    ])
+    monkeypatch.setattr(dashboard_backend._bot_session, 'get', lambda *args, **kwargs: next(responses))
+    monkeypatch.setattr(dashboard_backend, 'SIGNAL_HISTORY_TTL', -1)
+    client = dashboard_backend.dashboard_app.test_client()
+    
+    first = client.get('/api/signal-history?limit=7&offset=3')
+    assert first.status_code == 200
+    with caplog.at_level('WARNING', logger=dashboard_backend.logger.name):
+        stale = client.get('/api/signal-history?limit=7&offset=3')
+    assert stale.status_code == 200
+    assert stale.data == b'{"signals":[1]}'
+    assert 'status 503' in caplog.text
+
+
+# The pre-cache queries, used as the reference for the cached results
+FRESH_OVERVIEW_SQL = '''
+    SELECT 
+        COUNT(DISTINCT account_id) as total_traders,
+        SUM(total_trades) as total_trades,
+        SUM(total_profit) as total_profit,
+        AVG(win_rate) as avg_win_rate,
+        AVG(profit_factor) as avg_profit_factor
+    FROM trader_stats
+    WHERE total_trades > 0
+'''
+
+
+def fresh_leaderboard(database, metric, limit):
+    order_by = dashboard_backend.LEADERBOARD_ORDER_BY[metric]
+    rows = database._get_conn().execute(f'''
+        SELECT 
+            ts.*,
+            up.show_username,
+            up.display_name as custom_display_name,
+            ((ts.current_balance - ts.initial_balance) / ts.initial_balance * 100) as roi
+        FROM trader_stats ts
+        LEFT JOIN user_preferences up ON ts.account_id = up.account_id
+        WHERE ts.is_public = 1 AND ts.total_trades > 0
+        ORDER BY {order_by} DESC
+        LIMIT ?
+    ''', (limit,))
+    leaderboard = []
+    for rank, row in enumerate(rows, 1):
+        if row['show_username']:
+            display_name = row['username']
+        else:
+            display_name = row['custom_display_name'] or dashboard_backend.anonymous_name(row['account_id'])
+        leaderboard.append({
+            'rank': rank, 'account_id': row['account_id'], 'username': row['username'],
+            'display_name': display_name, 'total_profit': row['total_profit'],
+            'win_rate': row['win_rate'], 'profit_factor': row['profit_factor'],
+            'total_trades': row['total_trades'], 'roi': row['roi'],
+            'sharpe_ratio': row['sharpe_ratio'], 'last_trade': row['last_updated'],
+            'is_public': row['is_public'],
+        })
+    return leaderboard
+
+
+def assert_caches_match_fresh_queries(database):
+    expected = dict(database._get_conn().execute(FRESH_OVERVIEW_SQL).fetchone())
+    overview = database.get_overview()
+    assert overview.keys() == expected.keys()
+    for key, value in expected.items():
+        assert overview[key] == pytest.approx(value)
+    
+    database.refresh_leaderboard_cache()
+    for metric in dashboard_backend.LEADERBOARD_ORDER_BY:
+        for limit in (3, dashboard_backend.LEADERBOARD_DEFAULT_LIMIT):
+            expected = fresh_leaderboard(database, metric, limit)
+            assert database.get_leaderboard(metric, limit) == pytest.approx(expected)
+            body = orjson.loads(database.get_leaderboard_body(metric, limit))
+            assert body['data'] == pytest.approx(expected)
+            assert body['count'] == len(expected)
+
+
+def random_stats(rng, total_trades):
+    initial_balance = rng.choice([1000.0, 5000.0, 10000.0])
+    return {
+        'total_trades': total_trades,
+        'total_profit': round(rng.uniform(-500, 2000), 2),
+        'win_rate': round(rng.uniform(20, 80), 2),
+        'profit_factor': round(rng.uniform(0.5, 3), 3),
+        'sharpe_ratio': round(rng.uniform(-1, 3), 3),
+        'initial_balance': initial_balance,
+        'current_balance': round(initial_balance * rng.uniform(0.7, 1.6), 2),
+        'is_public': int(rng.random() < 0.8),
+    }
+
+
+def test_overview_and_leaderboard_caches_match_fresh_queries(database):
+    rng = random.Random(7)
+    accounts = [f'acct-{i:02d}' for i in range(12)]
+    assert_caches_match_fresh_queries(database)
+    
+    # Inserts, including traders with no trades yet
+    trade_counts = rng.sample(range(1, 200), len(accounts))
+    for account_id, total_trades in zip(accounts, trade_counts):
+        database.update_trader_stats(account_id, random_stats(rng, total_trades if rng.random() < 0.8 else 0))
+    with database._transaction() as conn:
+        conn.execute("INSERT INTO user_preferences (account_id, show_username) VALUES ('acct-01', 1)")
+        conn.execute("INSERT INTO user_preferences (account_id, display_name) VALUES ('acct-02', 'Pip Hunter')")
+    assert_caches_match_fresh_queries(database)
+    
+    # Updates, moving traders in and out of the counted set and the ranks
+    for account_id in accounts[::2]:
+        database.update_trader_stats(account_id, random_stats(rng, rng.choice([0, rng.randrange(200, 400)])))
+    database.update_trader_stats('acct-03', {'win_rate': None, 'profit_factor': None, 'total_trades': 5})
+    assert_caches_match_fresh_queries(database)
+    
+    # Deletes
+    with database._transaction() as conn:
+        conn.execute("DELETE FROM user_preferences WHERE account_id IN ('acct-01', 'acct-05')")
+        conn.execute("DELETE FROM trader_stats WHERE account_id IN ('acct-01', 'acct-05')")
+    assert_caches_match_fresh_queries(database)
+    
+    with database._transaction() as conn:
+        conn.execute('DELETE FROM user_preferences')
+        conn.execute('DELETE FROM trader_stats')
+    assert_caches_match_fresh_queries(database)
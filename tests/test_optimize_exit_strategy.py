@@ -0,0 +1,98 @@
+import random
+import sqlite3
+
+import pytest
+
+from optimize_exit_strategy import StrategyOptimizer
+
+
+@pytest.fixture
+def signals_db(tmp_path):
+    """A small signals DB covering stop-outs, every TP level, all risk
+    levels, a TP without a price and a signal without an entry price"""
+    rng = random.Random(11)
+    path = str(tmp_path / 'signals.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE signal_details (
+            signal_number INTEGER PRIMARY KEY,
+            symbol TEXT,
+            action TEXT,
+            entry_price REAL,
+            tp1 REAL, tp2 REAL, tp3 REAL, tp4 REAL, tp5 REAL, tp6 REAL,
+            risk_level TEXT,
+            created_at TIMESTAMP
+        );
+        CREATE TABLE announced_tps (
+            signal_number INTEGER,
+            tp_level INTEGER
+        );
+    ''')
+    for signal_number in range(1, 25):
+        entry = round(rng.uniform(1800, 2100), 2)
+        action = rng.choice(['BUY', 'SELL'])
+        direction = 1 if action == 'BUY' else -1
+        tps = [round(entry + direction * rng.uniform(1, 3) * level, 2) for level in range(1, 7)]
+        if signal_number % 7 == 0:
+            tps[2] = None
+        if signal_number % 5 != 0:
+            tps[5] = None
+        conn.execute(
+            'INSERT INTO signal_details VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (signal_number, 'XAUUSD', action, None if signal_number == 13 else entry, *tps,
+             rng.choice(['LOW', 'MEDIUM', 'HIGH', None]), '2024-01-01 00:00:00')
+        )
+        highest_tp = signal_number % 7
+        conn.executemany(
+            'INSERT INTO announced_tps VALUES (?, ?)',
+            [(signal_number, level) for level in range(1, highest_tp + 1)]
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def brute_force(optimizer, strategies, top_n):
+    """Rank strategies by summing calculate_signal_profit per signal"""
+    scored = []
+    for idx, strategy in enumerate(strategies.tolist()):
+        profits = [optimizer.calculate_signal_profit(signal, strategy) for signal in optimizer.signals]
+        scored.append((-sum(profits), idx, strategy, sum(p > 0 for p in profits)))
+    scored.sort()
+    return [(strategy, -total, wins) for total, _, strategy, wins in scored[:top_n]]
+
+
+@pytest.mark.parametrize('include_tp6', [False, True])
+def test_optimize_matches_brute_force(signals_db, include_tp6):
+    optimizer = StrategyOptimizer(signals_db)
+    results = optimizer.optimize(step=10, include_tp6=include_tp6, top_n=5)
+
+    expected = brute_force(optimizer, optimizer.generate_strategies(10, include_tp6), 5)
+    assert len(results) == 5
+    for result, (strategy, total, wins) in zip(results, expected):
+        assert result['strategy'].tolist() == strategy
+        assert result['total_pl'] == pytest.approx(total, rel=1e-12)
+        assert result['stats']['wins'] == wins
+        assert result['stats']['win_rate'] == pytest.approx(wins / len(optimizer.signals) * 100)
+    if not include_tp6:
+        assert all(result['strategy'][5] == 0 for result in results)
+
+
+def test_optimize_with_top_n_zero(signals_db):
+    optimizer = StrategyOptimizer(signals_db)
+    assert optimizer.optimize(step=10, top_n=0) == []
+
+
+def test_optimize_without_signals(tmp_path):
+    path = str(tmp_path / 'empty.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE signal_details (
+            signal_number INTEGER, symbol TEXT, action TEXT, entry_price REAL,
+            tp1 REAL, tp2 REAL, tp3 REAL, tp4 REAL, tp5 REAL, tp6 REAL,
+            risk_level TEXT, created_at TIMESTAMP
+        );
+        CREATE TABLE announced_tps (signal_number INTEGER, tp_level INTEGER);
+    ''')
+    conn.close()
+    assert StrategyOptimizer(path).optimize(step=10) is None
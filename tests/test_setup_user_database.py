@@ -0,0 +1,197 @@
+import os
+import shutil
+import sqlite3
+
+import setup_user_database
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The user tables as created before ids and timestamps became INTEGER, as
+# still found in the bundled telegram_messages.db
+OLD_SCHEMA_SQL = '''
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        discord_id TEXT UNIQUE NOT NULL,
+        discord_username TEXT NOT NULL,
+        discord_avatar TEXT,
+        email TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_login TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1
+    );
+    CREATE TABLE mt5_accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        account_number TEXT NOT NULL,
+        account_name TEXT,
+        broker TEXT,
+        server TEXT,
+        is_primary BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_sync TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        UNIQUE(user_id, account_number)
+    );
+    CREATE TABLE user_strategies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        strategy_name TEXT NOT NULL,
+        tp1_percent INTEGER NOT NULL DEFAULT 50,
+        tp2_percent INTEGER NOT NULL DEFAULT 20,
+        tp3_percent INTEGER NOT NULL DEFAULT 10,
+        tp4_percent INTEGER NOT NULL DEFAULT 10,
+        tp5_percent INTEGER NOT NULL DEFAULT 10,
+        tp6_percent INTEGER NOT NULL DEFAULT 0,
+        is_active BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        CHECK (tp1_percent + tp2_percent + tp3_percent + tp4_percent + tp5_percent + tp6_percent = 100)
+    );
+    CREATE TABLE sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        session_token TEXT UNIQUE NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    );
+    CREATE INDEX idx_users_discord_id ON users(discord_id);
+    CREATE INDEX idx_mt5_accounts_user_id ON mt5_accounts(user_id);
+    CREATE INDEX idx_mt5_accounts_account_number ON mt5_accounts(account_number);
+    CREATE INDEX idx_sessions_token ON sessions(session_token);
+    CREATE INDEX idx_sessions_user_id ON sessions(user_id);
+'''
+
+
+def assert_sample_data(db_path):
+    conn = sqlite3.connect(db_path)
+    users = conn.execute('SELECT id, discord_id, typeof(discord_id) FROM users').fetchall()
+    assert len(users) == 1 and users[0][1:] == (123456789, 'integer')
+    accounts = conn.execute('SELECT user_id, account_number, typeof(account_number) FROM mt5_accounts').fetchall()
+    assert accounts == [(users[0][0], 11060034, 'integer')]
+    conn.close()
+
+
+def index_names(db_path):
+    conn = sqlite3.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    return names
+
+
+def table_columns(db_path, table):
+    conn = sqlite3.connect(db_path)
+    columns = conn.execute(f'PRAGMA table_xinfo({table})').fetchall()
+    conn.close()
+    return columns
+
+
+def test_add_sample_data_on_old_text_schema(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript(OLD_SCHEMA_SQL)
+    conn.close()
+    
+    setup_user_database.create_user_tables(db_path)
+    setup_user_database.add_sample_data(db_path)
+    # Reruns find the existing user instead of adding another
+    setup_user_database.add_sample_data(db_path)
+    assert_sample_data(db_path)
+
+
+def test_add_sample_data_on_bundled_database(tmp_path):
+    db_path = str(tmp_path / 'telegram_messages.db')
+    shutil.copyfile(os.path.join(REPO_DIR, 'telegram_messages.db'), db_path)
+    
+    setup_user_database.add_sample_data(db_path)
+    assert_sample_data(db_path)
+
+
+def test_add_sample_data_on_new_schema(tmp_path):
+    db_path = str(tmp_path / 'new.db')
+    setup_user_database.create_user_tables(db_path)
+    setup_user_database.add_sample_data(db_path)
+    setup_user_database.add_sample_data(db_path)
+    assert_sample_data(db_path)
+
+
+def test_create_user_tables_migrates_old_schema(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript(OLD_SCHEMA_SQL)
+    conn.execute("INSERT INTO users (id, discord_id, discord_username, created_at, last_login) "
+                 "VALUES (7, '42', 'Old', '2024-01-02 03:04:05', NULL)")
+    conn.execute("INSERT INTO sessions (user_id, session_token, expires_at, created_at) "
+                 "VALUES (7, 'token', '2030-01-01 00:00:00', NULL)")
+    conn.execute("INSERT INTO mt5_accounts (user_id, account_number) VALUES (7, '1001')")
+    conn.execute("INSERT INTO user_strategies (user_id, strategy_name) VALUES (7, 'Old Strategy')")
+    conn.commit()
+    conn.close()
+    
+    setup_user_database.create_user_tables(db_path)
+    # Already migrated: nothing left to rebuild
+    setup_user_database.create_user_tables(db_path)
+    
+    fresh_path = str(tmp_path / 'fresh.db')
+    setup_user_database.create_user_tables(fresh_path)
+    for table in ('users', 'mt5_accounts', 'user_strategies', 'sessions'):
+        assert table_columns(db_path, table) == table_columns(fresh_path, table)
+    assert index_names(db_path) == index_names(fresh_path)
+    
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT id, discord_id, typeof(discord_id) FROM users').fetchall() == [(7, 42, 'integer')]
+    assert conn.execute('SELECT user_id, account_number FROM mt5_accounts').fetchall() == [(7, 1001)]
+    assert conn.execute('SELECT user_id, strategy_name, tp_total FROM user_strategies').fetchall() == [
+        (7, 'Old Strategy', 100)
+    ]
+    assert conn.execute('SELECT created_at, last_login FROM users').fetchall() == [(1704164645, None)]
+    [(token, expires_at, created_at)] = conn.execute('SELECT session_token, expires_at, created_at FROM sessions')
+    assert (token, expires_at) == ('token', 1893456000)
+    # NOT NULL columns fall back to their default for missing old values
+    assert isinstance(created_at, int)
+    assert conn.execute('PRAGMA foreign_key_check').fetchall() == []
+    conn.close()
+
+
+def test_create_user_tables_enables_incremental_vacuum(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript(OLD_SCHEMA_SQL)
+    conn.close()
+    
+    setup_user_database.create_user_tables(db_path)
+    setup_user_database.maintenance(db_path)
+    
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('PRAGMA page_size').fetchone()[0] == setup_user_database.PAGE_SIZE
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    conn.close()
+
+
+def schema_snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    snapshot = {
+        'schema': conn.execute(
+            "SELECT type, name, tbl_name, sql FROM sqlite_master "
+            "WHERE name NOT LIKE 'sqlite_stat%' ORDER BY type, name"
+        ).fetchall(),
+        'pragmas': [conn.execute(f'PRAGMA {pragma}').fetchone()[0]
+                    for pragma in ('page_size', 'auto_vacuum', 'journal_mode')],
+    }
+    conn.close()
+    return snapshot
+
+
+def test_template_matches_schema(tmp_path):
+    # Compared on a copy, so the check never touches the shipped file
+    template_path = str(tmp_path / 'template.db')
+    shutil.copyfile(setup_user_database.TEMPLATE_DB, template_path)
+    fresh_path = str(tmp_path / 'fresh.db')
+    setup_user_database.create_user_tables(fresh_path)
+    
+    assert schema_snapshot(template_path) == schema_snapshot(fresh_path), (
+        "template.db is out of date: rerun setup_user_database.build_template()"
+    )